@@ -0,0 +1,133 @@
+"""
+JWT authentication that trusts role claims while the user is unchanged.
+
+Access tokens carry the role, superuser flag and authentication stamp of
+the user. Read requests get a user object built from those claims as long
+as the stamp matches the one cached for the user, so they cost no query.
+Writes, tokens without the claims and users whose stamp moved, that is
+renamed, re-roled, deactivated or deleted ones, are loaded from the db.
+
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.functional import cached_property
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.models import UserRoles
+from users.stamps import get_auth_stamp, set_auth_stamp
+
+STAMP_CLAIM = 'ver'
+ROLE_CLAIM = 'role'
+
+
+def get_access_token(user):
+    """Access token carrying the claims read by `CachedJWTAuthentication`."""
+    token = AccessToken.for_user(user)
+    token['username'] = user.username
+    token[ROLE_CLAIM] = user.role
+    token['is_superuser'] = user.is_superuser
+    token[STAMP_CLAIM] = user.auth_stamp
+    return token
+
+
+class ClaimsUser(TokenUser):
+    """User built from the token claims, with the role helpers of `User`."""
+
+    @cached_property
+    def role(self):
+        return self.token[ROLE_CLAIM]
+
+    @property
+    def is_admin(self):
+        return self.role == UserRoles.ADMIN or self.is_superuser
+
+    @property
+    def is_moderator(self):
+        return self.role == UserRoles.MODERATOR
+
+    @property
+    def is_user(self):
+        return self.role == UserRoles.USER
+
+
+class TokenLRU:
+    """Bounded, thread-safe map of raw tokens to validated tokens."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.tokens = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, raw_token):
+        with self.lock:
+            token = self.tokens.get(raw_token)
+            if token is not None:
+                self.tokens.move_to_end(raw_token)
+        if token is not None and token['exp'] <= time.time():
+            self.discard(raw_token)
+            return None
+        return token
+
+    def set(self, raw_token, token):
+        with self.lock:
+            self.tokens[raw_token] = token
+            self.tokens.move_to_end(raw_token)
+            while len(self.tokens) > self.maxsize:
+                self.tokens.popitem(last=False)
+
+    def discard(self, raw_token):
+        with self.lock:
+            self.tokens.pop(raw_token, None)
+
+    def clear(self):
+        with self.lock:
+            self.tokens.clear()
+
+
+validated_tokens = TokenLRU(settings.AUTH_TOKEN_CACHE_SIZE)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT authentication with verified tokens and trusted claims cached."""
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        if request.method in SAFE_METHODS:
+            return self.get_claims_user(validated_token), validated_token
+        return self.get_user(validated_token), validated_token
+
+    def get_validated_token(self, raw_token):
+        validated_token = validated_tokens.get(raw_token)
+        if validated_token is None:
+            validated_token = super().get_validated_token(raw_token)
+            validated_tokens.set(raw_token, validated_token)
+        return validated_token
+
+    def get_user(self, validated_token):
+        """Load the user from the db and cache its current stamp."""
+        user = super().get_user(validated_token)
+        set_auth_stamp(user)
+        return user
+
+    def get_claims_user(self, validated_token):
+        """User from the claims if they are still current, else from the db."""
+        stamp = validated_token.get(STAMP_CLAIM)
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if stamp is None or user_id is None or (
+            get_auth_stamp(user_id) != stamp
+        ):
+            return self.get_user(validated_token)
+        return ClaimsUser(validated_token)
@@ -0,0 +1,164 @@
+import atexit
+import hashlib
+import json
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from reviews.versions import get_bump_counts, get_last_modified, get_versions
+
+STATS_KEY = 'response-cache:{}'
+stats_cache = caches['shared']
+
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+_stats_flushed = time.monotonic()
+
+
+def _count(name):
+    """Count in process memory, the shared cache is written in batches."""
+    with _stats_lock:
+        _stats[name] += 1
+        due = (
+            sum(_stats.values()) >= settings.RESPONSE_CACHE_STATS_BATCH
+            or time.monotonic() - _stats_flushed
+            >= settings.RESPONSE_CACHE_STATS_INTERVAL
+        )
+    if due:
+        flush_response_cache_stats()
+
+
+@atexit.register
+def flush_response_cache_stats():
+    """Add the counts of this process to the shared ones."""
+    global _stats_flushed
+    with _stats_lock:
+        counts = dict(_stats)
+        _stats.clear()
+        _stats_flushed = time.monotonic()
+    for name, value in counts.items():
+        try:
+            stats_cache.incr(STATS_KEY.format(name), value)
+        except ValueError:
+            stats_cache.add(STATS_KEY.format(name), value, timeout=None)
+
+
+def get_response_cache_stats(*labels):
+    """
+    Return hit, miss and invalidation counts of all processes.
+
+    Other processes may still hold up to a batch of uncounted requests.
+
+    """
+    flush_response_cache_stats()
+    counts = stats_cache.get_many(
+        [STATS_KEY.format('hits'), STATS_KEY.format('misses')]
+    )
+    return {
+        'hits': counts.get(STATS_KEY.format('hits'), 0),
+        'misses': counts.get(STATS_KEY.format('misses'), 0),
+        'invalidations': sum(get_bump_counts(*labels).values()),
+    }
+
+
+class VersionedViewMixin:
+    """Describe the state of a viewset's responses by model versions."""
+    versioned_models = ()
+
+    def get_version_labels(self):
+        return [model._meta.label_lower for model in self.versioned_models]
+
+    def get_state_digest(self, request, *extra):
+        """
+        Hash the request parameters together with the current versions
+        of `versioned_models`, any write to them changes the digest.
+
+        """
+        params = sorted(
+            (key, sorted(value for value in values if value))
+            for key, values in request.query_params.lists()
+        )
+        raw_key = json.dumps([
+            request.build_absolute_uri(request.path),
+            self.action,
+            params,
+            sorted(get_versions(*self.get_version_labels()).items()),
+            *extra,
+        ])
+        return hashlib.md5(raw_key.encode()).hexdigest()
+
+
+class ConditionalGetMixin(VersionedViewMixin):
+    """
+    Add strong `ETag` and `Last-Modified` validators to `list` and
+    `retrieve` responses and answer matching conditional requests
+    with 304 before the queryset is touched.
+
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def get_conditional_response(self, handler, request, *args, **kwargs):
+        etag = quote_etag(
+            self.get_state_digest(request, request.accepted_renderer.format)
+        )
+        last_modified = int(get_last_modified(*self.get_version_labels()))
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (
+            status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED
+        ):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class VersionedResponseCacheMixin(VersionedViewMixin):
+    """
+    Cache `list` and `retrieve` responses of a viewset.
+
+    The key is built from the normalized query parameters and the current
+    versions of `versioned_models`, so any write to those models makes the
+    cached responses unreachable without tracking their keys.
+
+    """
+    cache_timeout = settings.RESPONSE_CACHE_TIMEOUT
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        key = 'response:' + self.get_state_digest(request)
+        data = cache.get(key)
+        if data is not None:
+            _count('hits')
+            return Response(data)
+        _count('misses')
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, self.cache_timeout)
+        return response
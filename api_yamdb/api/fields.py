@@ -0,0 +1,71 @@
+from rest_framework import serializers
+
+from reviews.models import Title
+from reviews.snapshots import category_snapshot, genre_snapshot
+
+
+class CategorySnapshotField(serializers.Field):
+    """
+    Category of a title: written as a slug, read as name and slug.
+
+    Both directions go through the category snapshot instead of the
+    database, the field works with the `category_id` column directly.
+
+    """
+    default_error_messages = {
+        'does_not_exist': 'Object with slug={value} does not exist.',
+        'invalid': 'Invalid value.',
+    }
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('source', 'category_id')
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str):
+            self.fail('invalid')
+        pk = category_snapshot.get_id(data)
+        if pk is None:
+            self.fail('does_not_exist', value=data)
+        return pk
+
+    def to_representation(self, value):
+        return category_snapshot.get_representation(value)
+
+
+class GenreSnapshotField(serializers.ListField):
+    """
+    Genres of a title: written as a list of slugs, read as a list of
+    names and slugs.
+
+    Genre ids are taken from `prefetched_genre_ids` when the list
+    serializer has loaded them for the whole page, otherwise from the
+    title-genre table. Genre rows themselves come from the snapshot.
+
+    """
+    child = serializers.CharField()
+    default_error_messages = {
+        'does_not_exist': 'Object with slug={value} does not exist.',
+    }
+
+    def get_attribute(self, instance):
+        genre_ids = getattr(instance, 'prefetched_genre_ids', None)
+        if genre_ids is None:
+            genre_ids = list(
+                Title.genre.through.objects.filter(
+                    title_id=instance.id
+                ).order_by('id').values_list('genre_id', flat=True)
+            )
+        return genre_ids
+
+    def to_internal_value(self, data):
+        genre_ids = []
+        for slug in super().to_internal_value(data):
+            pk = genre_snapshot.get_id(slug)
+            if pk is None:
+                self.fail('does_not_exist', value=slug)
+            genre_ids.append(pk)
+        return genre_ids
+
+    def to_representation(self, data):
+        return [genre_snapshot.get_representation(pk) for pk in data]
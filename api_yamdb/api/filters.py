@@ -1,6 +1,7 @@
 import django_filters
 
 from reviews.models import Title
+from reviews.snapshots import category_snapshot, genre_snapshot
 
 
 class TitleFilter(django_filters.FilterSet):
@@ -8,20 +9,31 @@ class TitleFilter(django_filters.FilterSet):
     Filter Title queryset by category slug,
     genre slug, year and/or name fields.
 
+    Slugs are resolved to ids through the group snapshots,
+    so the genre and category tables are not joined. Names are
+    compared by the indexed case-folded `name_key` column.
+
     """
-    category = django_filters.CharFilter(
-        field_name='category__slug', lookup_expr='iexact'
-    )
-    genre = django_filters.CharFilter(
-        field_name='genre__slug', lookup_expr='iexact'
-    )
+    category = django_filters.CharFilter(method='filter_category')
+    genre = django_filters.CharFilter(method='filter_genre')
     year = django_filters.NumberFilter(
         field_name='year', lookup_expr='exact'
     )
-    name = django_filters.CharFilter(
-        field_name='name', lookup_expr='iexact'
-    )
+    name = django_filters.CharFilter(method='filter_name')
 
     class Meta:
         model = Title
         fields = ('category', 'genre', 'year', 'name')
+
+    def filter_category(self, queryset, name, value):
+        return queryset.filter(
+            category_id__in=category_snapshot.get_ids_iexact(value)
+        )
+
+    def filter_genre(self, queryset, name, value):
+        return queryset.filter(
+            genre__in=genre_snapshot.get_ids_iexact(value)
+        )
+
+    def filter_name(self, queryset, name, value):
+        return queryset.filter(name_key=value.casefold())
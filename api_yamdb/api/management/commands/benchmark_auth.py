@@ -0,0 +1,93 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+
+from users.models import ConfirmationCode, OutgoingEmail, User
+
+SIGNUP_URL = '/api/v1/auth/signup/'
+TOKEN_URL = '/api/v1/auth/token/'
+PREFIX = 'benchmark_user_'
+STATEMENTS = ('SELECT', 'INSERT', 'UPDATE', 'DELETE')
+
+
+class Command(BaseCommand):
+    help = (
+        'Measures requests/sec and statements per request of the signup '
+        'and token endpoints. Every request runs in its own transaction, '
+        'the created users and e-mails are deleted afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests', type=int, default=200,
+            help='Number of requests sent to each scenario.'
+        )
+
+    def measure(self, name, send, count):
+        client = APIClient()
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            for idx in range(count):
+                response = send(client, idx)
+                if response.status_code != 200:
+                    raise CommandError(
+                        f'{name}: unexpected response '
+                        f'{response.status_code} {response.content!r}'
+                    )
+            seconds = time.perf_counter() - started
+        statements = [
+            query for query in context.captured_queries
+            if query['sql'].startswith(STATEMENTS)
+        ]
+        self.stdout.write(
+            f'{name}: {count / seconds:.0f} req/s, '
+            f'{len(statements) / count:.1f} statements/request'
+        )
+
+    def run(self, count):
+        def new_user(client, idx):
+            return client.post(SIGNUP_URL, data={
+                'username': f'{PREFIX}{idx}',
+                'email': f'{PREFIX}{idx}@yamdb.fake',
+            })
+
+        def repeat_signup(client, idx):
+            return new_user(client, idx % 10)
+
+        def token(client, idx):
+            confirmation = ConfirmationCode.objects.get(
+                user__username=f'{PREFIX}{idx}'
+            )
+            return client.post(TOKEN_URL, data={
+                'username': f'{PREFIX}{idx}',
+                'confirmation_code': confirmation.code,
+            })
+
+        self.measure('Signup, new user', new_user, count)
+        self.measure('Signup, code sent again', repeat_signup, count)
+        self.measure('Token (+1 lookup for the code)', token, count)
+
+    def clean_up(self):
+        User.objects.filter(username__startswith=PREFIX).delete()
+        OutgoingEmail.objects.filter(to_email__startswith=PREFIX).delete()
+
+    @override_settings(
+        # Repeated requests from one client would be throttled.
+        CACHES={**settings.CACHES, 'throttle': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        }},
+    )
+    def handle(self, *args, **options):
+        if User.objects.filter(username__startswith=PREFIX).exists():
+            raise CommandError(
+                f'Users named {PREFIX}* exist, remove them before running '
+                'the benchmark.'
+            )
+        try:
+            self.run(options['requests'])
+        finally:
+            self.clean_up()
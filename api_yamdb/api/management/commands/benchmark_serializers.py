@@ -0,0 +1,89 @@
+import timeit
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.serializers import (
+    CommentReadSerializer, CommentSerializer, ReviewReadSerializer,
+    ReviewSerializer, TitleDetailReadSerializer, TitleDetailSerializer,
+    TitleReadSerializer, TitleSerializer,
+)
+from reviews.models import Comment, Review, Title, User
+
+
+def make_titles(count):
+    titles = []
+    for idx in range(count):
+        title = Title(
+            id=idx + 1, name=f'Title {idx}', year=2000,
+            description='Description', score_sum=idx % 50,
+            review_count=idx % 5,
+        )
+        title.prefetched_genre_ids = []
+        titles.append(title)
+    return titles
+
+
+def make_reviews(count):
+    author = User(username='author')
+    return [
+        Review(id=idx + 1, text='Review', author=author, score=idx % 10 + 1,
+               pub_date=timezone.now())
+        for idx in range(count)
+    ]
+
+
+def make_comments(count):
+    author = User(username='author')
+    return [
+        Comment(id=idx + 1, text='Comment', author=author,
+                pub_date=timezone.now())
+        for idx in range(count)
+    ]
+
+
+BENCHMARKS = (
+    ('Title', make_titles, TitleSerializer, TitleReadSerializer),
+    ('Title detail', make_titles, TitleDetailSerializer,
+     TitleDetailReadSerializer),
+    ('Review', make_reviews, ReviewSerializer, ReviewReadSerializer),
+    ('Comment', make_comments, CommentSerializer, CommentReadSerializer),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares per-row cost of the write and read-only serializers '
+        'on lists of in-memory objects.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows', type=int, default=1000,
+            help='Number of in-memory objects serialized per run.'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='Number of runs, the fastest one is reported.'
+        )
+
+    def measure(self, serializer_class, objects, repeat):
+        seconds = min(timeit.repeat(
+            lambda: serializer_class(objects, many=True).data,
+            number=1, repeat=repeat,
+        ))
+        return seconds / len(objects) * 10 ** 6
+
+    def handle(self, *args, **options):
+        for name, factory, serializer_class, read_class in BENCHMARKS:
+            objects = factory(options['rows'])
+            assert (
+                serializer_class(objects, many=True).data
+                == read_class(objects, many=True).data
+            ), f'{name} representations differ.'
+            slow = self.measure(serializer_class, objects, options['repeat'])
+            fast = self.measure(read_class, objects, options['repeat'])
+            self.stdout.write(
+                f'{name}: {slow:.1f} us/row -> {fast:.1f} us/row '
+                f'({slow / fast:.1f}x)'
+            )
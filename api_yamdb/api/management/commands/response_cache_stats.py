@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from api.cache import get_response_cache_stats
+from api.views import TitleViewSet
+
+
+class Command(BaseCommand):
+    help = 'Shows hit, miss and invalidation counts of the response cache.'
+
+    def handle(self, *args, **options):
+        stats = get_response_cache_stats(
+            *TitleViewSet().get_version_labels()
+        )
+        lookups = stats['hits'] + stats['misses']
+        ratio = stats['hits'] / lookups if lookups else 0
+        self.stdout.write(
+            f'Hits: {stats["hits"]}\n'
+            f'Misses: {stats["misses"]}\n'
+            f'Hit ratio: {ratio:.1%}\n'
+            f'Invalidations: {stats["invalidations"]}'
+        )
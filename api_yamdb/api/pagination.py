@@ -0,0 +1,136 @@
+import heapq
+from base64 import b64decode, b64encode
+from datetime import datetime
+from itertools import islice
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (BasePagination, CursorPagination,
+                                       PageNumberPagination)
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class PageNumberOrCursorPagination(PageNumberPagination):
+    """
+    Page number pagination by default, keyset pagination on request.
+
+    Clients opt in with `?pagination=cursor` and then follow the `next`
+    and `previous` links. In cursor mode the page is fetched by the view's
+    `cursor_ordering`, so deep pages cost the same as the first one and
+    no `COUNT(*)` query is made.
+
+    """
+    mode_query_param = 'pagination'
+    cursor_mode = 'cursor'
+
+    def __init__(self):
+        self.cursor_paginator = None
+
+    def is_cursor_mode(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == self.cursor_mode
+            or CursorPagination.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if view is None or not self.is_cursor_mode(request):
+            return super().paginate_queryset(queryset, request, view)
+        self.cursor_paginator = CursorPagination()
+        self.cursor_paginator.ordering = view.cursor_ordering
+        self.cursor_paginator.page_size = self.page_size
+        return self.cursor_paginator.paginate_queryset(
+            queryset, request, view
+        )
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class MergedFeedPagination(BasePagination):
+    """
+    Keyset pagination over several querysets merged newest first.
+
+    Every source is read with its own query of at most one page ordered by
+    `-pub_date, -id` after the cursor, and the pages are merged with a
+    k-way merge. With an index on the filter columns and `pub_date` a page
+    costs one index range scan per source, however long the history is.
+    Ties on `pub_date` are broken by the source order, then by id.
+
+    """
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self):
+        self.request = None
+        self.next_position = None
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            pub_date, rank, pk = b64decode(
+                encoded.encode('ascii')
+            ).decode('ascii').split('|')
+            return datetime.fromisoformat(pub_date), int(rank), int(pk)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, position):
+        pub_date, rank, pk = position
+        encoded = b64encode(
+            f'{pub_date.isoformat()}|{rank}|{pk}'.encode('ascii')
+        ).decode('ascii')
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            encoded,
+        )
+
+    @staticmethod
+    def after_cursor(cursor, rank):
+        """Rows of the source with this rank that follow the cursor."""
+        pub_date, cursor_rank, pk = cursor
+        if rank < cursor_rank:
+            return Q(pub_date__lte=pub_date)
+        if rank > cursor_rank:
+            return Q(pub_date__lt=pub_date)
+        return Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, id__lt=pk)
+
+    def paginate_sources(self, sources, request):
+        """Merge a page out of a sequence of querysets."""
+        self.request = request
+        cursor = self.decode_cursor(request)
+        streams = []
+        for rank, queryset in enumerate(sources):
+            if cursor is not None:
+                queryset = queryset.filter(self.after_cursor(cursor, rank))
+            streams.append([
+                (obj.pub_date, rank, obj.id, obj)
+                for obj in queryset.order_by('-pub_date', '-id')[
+                    :self.page_size + 1
+                ]
+            ])
+        merged = list(islice(
+            heapq.merge(*streams, key=lambda item: item[:3], reverse=True),
+            self.page_size + 1,
+        ))
+        page = merged[:self.page_size]
+        self.next_position = (
+            page[-1][:3] if len(merged) > self.page_size else None
+        )
+        return [item[3] for item in page]
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': (
+                self.encode_cursor(self.next_position)
+                if self.next_position else None
+            ),
+            'results': data,
+        })
@@ -32,6 +32,19 @@ class IsAdminOnly(BasePermission):
                 and (request.user.is_admin or request.user.is_superuser))
 
 
+class IsModeratorOrAdmin(BasePermission):
+    """
+    Must be an authenticated moderator, administrator or superuser.
+
+    """
+    message = "This action is not allowed."
+
+    def has_permission(self, request, view):
+        return (request.user.is_authenticated
+                and (request.user.is_moderator or request.user.is_admin
+                     or request.user.is_superuser))
+
+
 class IsOwnerAdminModeratorOrReadOnly(BasePermission):
     """
     Must be superuser or administrator or author of the instance
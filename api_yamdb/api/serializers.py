@@ -1,11 +1,17 @@
-from django.db.models import Avg
+from django.conf import settings
+from django.db.models import Manager
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from rest_framework import serializers
+from django.utils.functional import cached_property
+from rest_framework import ISO_8601, serializers
 from rest_framework.relations import SlugRelatedField
+from rest_framework.settings import api_settings
 from rest_framework.validators import UniqueTogetherValidator
-
 from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.snapshots import category_snapshot, genre_snapshot
+from users.codes import check_code
+
+from api.fields import CategorySnapshotField, GenreSnapshotField
 
 
 class GenreSerializer(serializers.ModelSerializer):
@@ -48,18 +54,27 @@ class CategorySerializer(serializers.ModelSerializer):
         return value
 
 
+class TitleListSerializer(serializers.ListSerializer):
+    """Load the genre ids of all titles with one query."""
+
+    def to_representation(self, data):
+        titles = list(data.all() if isinstance(data, Manager) else data)
+        genre_ids = {title.id: [] for title in titles}
+        if genre_ids:
+            for title_id, genre_id in Title.genre.through.objects.filter(
+                title_id__in=genre_ids
+            ).order_by('id').values_list('title_id', 'genre_id'):
+                genre_ids[title_id].append(genre_id)
+        for title in titles:
+            title.prefetched_genre_ids = genre_ids[title.id]
+        return super().to_representation(titles)
+
+
 class TitleSerializer(serializers.ModelSerializer):
     """Title model serializer."""
-    genre = serializers.SlugRelatedField(
-        slug_field='slug',
-        many=True,
-        queryset=Genre.objects.all(),
-    )
-    category = serializers.SlugRelatedField(
-        slug_field='slug',
-        queryset=Category.objects.all(),
-    )
-    rating = serializers.SerializerMethodField()
+    genre = GenreSnapshotField()
+    category = CategorySnapshotField()
+    rating = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Title
@@ -69,10 +84,12 @@ class TitleSerializer(serializers.ModelSerializer):
             'year',
             'description',
             'rating',
+            'review_count',
             'category',
             'genre',
         )
-        read_only_fields = ('id', 'rating')
+        read_only_fields = ('id', 'rating', 'review_count')
+        list_serializer_class = TitleListSerializer
         validators = [
             UniqueTogetherValidator(
                 queryset=Title.objects.all(),
@@ -93,21 +110,168 @@ class TitleSerializer(serializers.ModelSerializer):
             )
         return value
 
-    def get_rating(self, obj):
-        rating = obj.reviews.aggregate(Avg('score')).get('score__avg')
-        rating_rounded = round(rating) if rating else rating
-        return rating_rounded
+    def create(self, validated_data):
+        genre_ids = validated_data.pop('genre')
+        title = super().create(validated_data)
+        title.genre.add(*genre_ids)
+        return title
+
+    def update(self, instance, validated_data):
+        """Change genres through the title-genre table only."""
+        genre_ids = validated_data.pop('genre', None)
+        instance = super().update(instance, validated_data)
+        if genre_ids is not None:
+            current_ids = set(
+                Title.genre.through.objects.filter(
+                    title_id=instance.id
+                ).values_list('genre_id', flat=True)
+            )
+            instance.genre.remove(*(current_ids - set(genre_ids)))
+            instance.genre.add(*(set(genre_ids) - current_ids))
+        return instance
 
     def to_representation(self, instance):
         representation = super().to_representation(instance)
-        representation['genre'] = GenreSerializer(
-            instance.genre,
-            many=True,
-        ).data
-        representation['category'] = CategorySerializer(instance.category).data
+        if representation['category'] is None:
+            representation['category'] = category_snapshot.get_representation(
+                None
+            )
+        return representation
+
+
+class TitleDetailSerializer(TitleSerializer):
+    """Title model serializer with the distribution of review scores."""
+    score_distribution = serializers.DictField(
+        child=serializers.IntegerField(), read_only=True
+    )
+
+    class Meta(TitleSerializer.Meta):
+        fields = TitleSerializer.Meta.fields + ('score_distribution',)
+        read_only_fields = TitleSerializer.Meta.read_only_fields + (
+            'score_distribution',
+        )
+
+
+class ReadOnlySerializer(serializers.BaseSerializer):
+    """
+    Fast read path building plain dicts without the field machinery.
+
+    Output must stay identical to the serializer used for writes.
+
+    """
+    datetime_field = serializers.DateTimeField()
+
+    def to_internal_value(self, data):
+        raise NotImplementedError(
+            f'{self.__class__.__name__} is read-only.'
+        )
+
+    @cached_property
+    def current_timezone(self):
+        return timezone.get_current_timezone() if settings.USE_TZ else None
+
+    def format_datetime(self, value):
+        """`DateTimeField` output, computed directly for aware values."""
+        if (
+            not value or value.tzinfo is None
+            or self.current_timezone is None
+            or api_settings.DATETIME_FORMAT != ISO_8601
+        ):
+            return self.datetime_field.to_representation(value)
+        value = value.astimezone(self.current_timezone).isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+
+
+class TitleReadListSerializer(TitleListSerializer):
+    """Refresh the group snapshots once for the whole page."""
+
+    def to_representation(self, data):
+        self.child.refresh_snapshots()
+        return super().to_representation(data)
+
+
+class TitleReadSerializer(ReadOnlySerializer):
+    """Read path of `TitleSerializer`."""
+
+    class Meta:
+        list_serializer_class = TitleReadListSerializer
+
+    def refresh_snapshots(self):
+        category_snapshot.refresh()
+        genre_snapshot.refresh()
+
+    def get_genre_ids(self, title):
+        genre_ids = getattr(title, 'prefetched_genre_ids', None)
+        if genre_ids is None:
+            genre_ids = Title.genre.through.objects.filter(
+                title_id=title.id
+            ).order_by('id').values_list('genre_id', flat=True)
+        return genre_ids
+
+    def to_representation(self, title):
+        if self.parent is None:
+            self.refresh_snapshots()
+        rating = title.rating
+        return {
+            'id': title.id,
+            'name': title.name,
+            'year': title.year,
+            'description': title.description,
+            'rating': None if rating is None else int(rating),
+            'review_count': title.review_count,
+            'category': category_snapshot.get_representation(
+                title.category_id, refresh=False
+            ),
+            'genre': [
+                genre_snapshot.get_representation(pk, refresh=False)
+                for pk in self.get_genre_ids(title)
+            ],
+        }
+
+
+class TitleDetailReadSerializer(TitleReadSerializer):
+    """Read path of `TitleDetailSerializer`."""
+
+    def to_representation(self, title):
+        representation = super().to_representation(title)
+        representation['score_distribution'] = {
+            str(score): count
+            for score, count in title.score_distribution.items()
+        }
         return representation
 
 
+class TitleStatsSerializer(serializers.ModelSerializer):
+    """Review score statistics of a title."""
+    rating = serializers.IntegerField(read_only=True)
+    median = serializers.FloatField(source='median_score', read_only=True)
+    percentiles = serializers.SerializerMethodField()
+    score_distribution = serializers.DictField(
+        child=serializers.IntegerField(), read_only=True
+    )
+
+    class Meta:
+        model = Title
+        fields = (
+            'id',
+            'review_count',
+            'rating',
+            'average_score',
+            'median',
+            'percentiles',
+            'score_distribution',
+        )
+        read_only_fields = fields
+
+    def get_percentiles(self, obj):
+        return {
+            str(percent): obj.score_percentile(percent)
+            for percent in (25, 75, 90)
+        }
+
+
 class ReviewSerializer(serializers.ModelSerializer):
     """Review model serializer."""
     author = SlugRelatedField(
@@ -117,8 +281,12 @@ class ReviewSerializer(serializers.ModelSerializer):
     )
 
     class Meta:
-        fields = ("id", "text", "author", "score", "pub_date")
-        read_only_fields = ("id", "title", "author", "pub_date")
+        fields = (
+            "id", "text", "author", "score", "pub_date", "comment_count",
+        )
+        read_only_fields = (
+            "id", "title", "author", "pub_date", "comment_count",
+        )
         model = Review
 
     def validate(self, data):
@@ -144,28 +312,93 @@ class CommentSerializer(serializers.ModelSerializer):
         model = Comment
 
 
+class ReviewReadSerializer(ReadOnlySerializer):
+    """Read path of `ReviewSerializer`, expects the author preloaded."""
+
+    def to_representation(self, review):
+        return {
+            'id': review.id,
+            'text': review.text,
+            'author': review.author.username,
+            'score': review.score,
+            'pub_date': self.format_datetime(review.pub_date),
+            'comment_count': review.comment_count,
+        }
+
+
+class CommentReadSerializer(ReadOnlySerializer):
+    """Read path of `CommentSerializer`, expects the author preloaded."""
+
+    def to_representation(self, comment):
+        return {
+            'id': comment.id,
+            'text': comment.text,
+            'author': comment.author.username,
+            'pub_date': self.format_datetime(comment.pub_date),
+        }
+
+
+class ActivityReadSerializer(ReadOnlySerializer):
+    """
+    Reviews and comments of a user's activity feed, comments are expected
+    to carry the `title_id` of their review.
+
+    """
+
+    def to_representation(self, obj):
+        if isinstance(obj, Review):
+            return {
+                'type': 'review',
+                'id': obj.id,
+                'title_id': obj.title_id,
+                'text': obj.text,
+                'score': obj.score,
+                'pub_date': self.format_datetime(obj.pub_date),
+            }
+        return {
+            'type': 'comment',
+            'id': obj.id,
+            'title_id': obj.title_id,
+            'review_id': obj.review_id,
+            'text': obj.text,
+            'pub_date': self.format_datetime(obj.pub_date),
+        }
+
+
 class SignUpSerializer(serializers.ModelSerializer):
-    """Serializer for user registration."""
+    """Serializer for user registration.
+
+    Uniqueness is resolved by the signup view with a single lookup, so the
+    per-field unique validators are left out.
+    """
 
     class Meta:
         model = User
         fields = ('username', 'email')
+        extra_kwargs = {
+            'username': {
+                'validators': User._meta.get_field('username').validators,
+            },
+            'email': {'validators': []},
+        }
 
 
-class TokenSerializer(serializers.ModelSerializer):
+class TokenSerializer(serializers.Serializer):
     """Serializer for getting token."""
 
-    class Meta:
-        model = User
-        fields = ('username', 'confirmation_code')
+    username = serializers.CharField(max_length=settings.LIMIT_USERNAME)
+    confirmation_code = serializers.CharField(max_length=50)
 
     def validate(self, data):
-        username = data['username']
-        user = get_object_or_404(User, username=username)
-        if user.confirmation_code != data['confirmation_code']:
+        user = get_object_or_404(
+            User.objects.select_related('confirmation'),
+            username=data['username'],
+        )
+        if not check_code(user, data['confirmation_code']):
             raise serializers.ValidationError(
                 {'confirmation_code': 'Confirmation code is not correct.'}
             )
+        data['user'] = user
         return data
 
 
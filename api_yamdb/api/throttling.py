@@ -0,0 +1,135 @@
+import hashlib
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import BaseThrottle, SimpleRateThrottle
+
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 60 * 60 * 24}
+
+
+class AuthRateThrottle(SimpleRateThrottle):
+    """Rate limit of the auth endpoints kept in the `throttle` cache."""
+
+    @property
+    def cache(self):
+        return caches['throttle']
+
+    def get_subject(self, request):
+        """Return what the requests are counted by, None to skip."""
+        raise NotImplementedError
+
+    def get_cache_key(self, request, view):
+        ident = self.get_subject(request)
+        if not ident:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+class UsernameRateThrottle(AuthRateThrottle):
+    """Limits requests naming one username, whoever sends them."""
+
+    def get_subject(self, request):
+        username = request.data.get('username')
+        if not username:
+            return None
+        # Raw usernames are not safe cache keys.
+        return hashlib.md5(str(username).encode()).hexdigest()
+
+
+class IPRateThrottle(AuthRateThrottle):
+    """Limits requests sent from one address."""
+
+    def get_subject(self, request):
+        return self.get_ident(request)
+
+
+class SignupUsernameThrottle(UsernameRateThrottle):
+    scope = 'signup_username'
+
+
+class SignupIPThrottle(IPRateThrottle):
+    scope = 'signup_ip'
+
+
+class TokenUsernameThrottle(UsernameRateThrottle):
+    scope = 'token_username'
+
+
+class TokenIPThrottle(IPRateThrottle):
+    scope = 'token_ip'
+
+
+def parse_budget(budget):
+    """Turn '120/min' into the bucket capacity and refill per second."""
+    capacity, period = budget.split('/')
+    capacity = int(capacity)
+    return capacity, capacity / PERIODS[period[0]]
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Token bucket per client, sized by the view scope and the user role.
+
+    Budgets come from `THROTTLE_BUCKETS[scope][role]`, unsafe requests use
+    the `<scope>_write` budgets when they are defined. A bucket is one
+    `(tokens, timestamp)` entry of the `throttle` cache, so a check is a
+    cache read and write and never touches the database.
+
+    """
+
+    scope = None
+    timer = time.time
+
+    @property
+    def cache(self):
+        return caches['throttle']
+
+    def get_scope(self, request, view):
+        scope = self.scope or getattr(view, 'throttle_scope', None)
+        if scope is None or request.method in SAFE_METHODS:
+            return scope
+        write_scope = f'{scope}_write'
+        if write_scope in settings.THROTTLE_BUCKETS:
+            return write_scope
+        return scope
+
+    def get_role(self, user):
+        if not user or not user.is_authenticated:
+            return 'anon'
+        return 'admin' if user.is_admin else user.role
+
+    def allow_request(self, request, view):
+        scope = self.get_scope(request, view)
+        budget = settings.THROTTLE_BUCKETS.get(scope, {}).get(
+            self.get_role(request.user)
+        )
+        if budget is None:
+            return True
+        capacity, refill = parse_budget(budget)
+        ident = (
+            request.user.pk if request.user.is_authenticated
+            else self.get_ident(request)
+        )
+        key = f'bucket:{scope}:{ident}'
+        now = self.timer()
+        tokens, updated = self.cache.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * refill)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        else:
+            self.wait_seconds = (1 - tokens) / refill
+        self.cache.set(
+            key, (tokens, now), timeout=math.ceil(capacity / refill)
+        )
+        return allowed
+
+    def wait(self):
+        return getattr(self, 'wait_seconds', None)
+
+
+class AuthBucketThrottle(TokenBucketThrottle):
+    scope = 'auth'
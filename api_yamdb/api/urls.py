@@ -4,7 +4,7 @@ from rest_framework.routers import DefaultRouter
 from api.views import (
     CategoryListCreateDeleteViewSet, CommentViewSet,
     GenreListCreateDeleteViewSet, ReviewViewSet, TitleViewSet, UserViewSet,
-    signup, get_token,
+    export_data, signup, get_token,
 )
 
 app_name = 'api'
@@ -50,4 +50,5 @@ urlpatterns = [
     path('v1/genres/<slug:slug>/', genre_detail, name='genre-detail'),
     path('v1/auth/signup/', signup),
     path('v1/auth/token/', get_token),
+    path('v1/export/<str:model>/', export_data),
 ]
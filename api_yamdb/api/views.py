@@ -1,32 +1,50 @@
-from random import sample
-from string import hexdigits
-
 from django.conf import settings
-from django.core.mail import send_mail
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, mixins, status, viewsets
-from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.decorators import (
+    action, api_view, permission_classes, throttle_classes,
+)
+from rest_framework.exceptions import ValidationError
 from rest_framework.filters import SearchFilter
 from rest_framework.permissions import (
-    AllowAny, IsAuthenticated, IsAuthenticatedOrReadOnly,
+    SAFE_METHODS, AllowAny, IsAuthenticated, IsAuthenticatedOrReadOnly,
 )
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import AccessToken
-from reviews.models import Category, Genre, Review, Title, User
-
+from reviews.export import EXPORT_FORMATS, EXPORTS, stream_export
+from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.search import search_titles
+from users.codes import issue_code
+from users.outbox import queue_email
+
+from api.authentication import get_access_token
+from api.cache import ConditionalGetMixin, VersionedResponseCacheMixin
 from api.filters import TitleFilter
+from api.pagination import (
+    MergedFeedPagination, PageNumberOrCursorPagination,
+)
 from api.permissions import (
-    IsAdminOnly, IsAdminOrReadOnly, IsOwnerAdminModeratorOrReadOnly,
+    IsAdminOnly, IsAdminOrReadOnly, IsModeratorOrAdmin,
+    IsOwnerAdminModeratorOrReadOnly,
 )
 from api.serializers import (
-    CategorySerializer, CommentSerializer, GenreSerializer, ReviewSerializer,
-    SignUpSerializer, TitleSerializer, TokenSerializer, UserSerializer,
+    ActivityReadSerializer, CategorySerializer, CommentReadSerializer,
+    CommentSerializer, GenreSerializer, ReviewReadSerializer,
+    ReviewSerializer, SignUpSerializer, TitleDetailReadSerializer,
+    TitleReadSerializer, TitleSerializer, TitleStatsSerializer,
+    TokenSerializer, UserSerializer,
+)
+from api.throttling import (
+    AuthBucketThrottle, SignupIPThrottle, SignupUsernameThrottle,
+    TokenIPThrottle, TokenUsernameThrottle,
 )
 
 
-class ListCreateDeleteViewSet(mixins.CreateModelMixin, mixins.ListModelMixin,
-                              mixins.DestroyModelMixin,
+class ListCreateDeleteViewSet(ConditionalGetMixin, mixins.CreateModelMixin,
+                              mixins.ListModelMixin, mixins.DestroyModelMixin,
                               viewsets.GenericViewSet):
     lookup_field = 'slug'
     permission_classes = (IsAdminOrReadOnly,)
@@ -37,102 +55,233 @@ class ListCreateDeleteViewSet(mixins.CreateModelMixin, mixins.ListModelMixin,
 class GenreListCreateDeleteViewSet(ListCreateDeleteViewSet):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    versioned_models = (Genre,)
 
 
 class CategoryListCreateDeleteViewSet(ListCreateDeleteViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    versioned_models = (Category,)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.all()
+class TitleViewSet(ConditionalGetMixin, VersionedResponseCacheMixin,
+                   viewsets.ModelViewSet):
+    queryset = Title.objects.order_by('id')
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
     serializer_class = TitleSerializer
     permission_classes = (IsAdminOrReadOnly,)
+    pagination_class = PageNumberOrCursorPagination
+    cursor_ordering = ('id',)
+    versioned_models = (Title, Genre, Category, Review)
+    throttle_scope = 'titles'
+
+    def get_serializer_class(self):
+        if self.action == 'stats':
+            return TitleStatsSerializer
+        if self.request.method in SAFE_METHODS:
+            if self.action == 'retrieve':
+                return TitleDetailReadSerializer
+            return TitleReadSerializer
+        return super().get_serializer_class()
+
+    @action(detail=True, url_path='stats')
+    def stats(self, request, pk=None):
+        """Review score statistics read from the title's counters."""
+        serializer = self.get_serializer(self.get_object())
+        return Response(serializer.data)
+
+    @action(detail=False, url_path='top')
+    def top(self, request):
+        """
+        Best rated titles, optionally by genre, category and/or year.
+
+        Titles with fewer than `LEADERBOARD_MIN_REVIEWS` reviews are left out.
+        The ordering follows the persisted average score and its indexes,
+        so the cost depends on the size of the board, not on the reviews.
+
+        """
+        try:
+            limit = int(
+                request.query_params.get('limit', settings.LEADERBOARD_SIZE)
+            )
+        except ValueError:
+            raise ValidationError({'limit': 'A valid integer is required.'})
+        limit = max(1, min(limit, settings.LEADERBOARD_MAX_SIZE))
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            review_count__gte=settings.LEADERBOARD_MIN_REVIEWS
+        ).order_by('-average_score', '-review_count', 'id')[:limit]
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
+
+    @action(detail=False, url_path='search')
+    def search(self, request):
+        """
+        Full-text search by name and description ranked by relevance,
+        combinable with the title filter fields.
+
+        Cursor pagination is refused: it would order the page by
+        `cursor_ordering` and lose the ranking.
+
+        """
+        text = request.query_params.get('q', '').strip()
+        if not text:
+            raise ValidationError({'q': 'This query parameter is required.'})
+        if self.paginator.is_cursor_mode(request):
+            raise ValidationError({
+                'pagination': 'Search results are ranked by relevance and '
+                              'only support page number pagination.'
+            })
+        queryset = search_titles(
+            self.filter_queryset(self.get_queryset()), text
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
+
+
+class ParentCheckMixin:
+    """
+    Listings filter by the parent ids from the URL in the same query, the
+    parent objects are looked up only to tell an empty list from a 404.
+
+    """
 
+    def get_parent(self):
+        raise NotImplementedError
 
-class ReviewViewSet(viewsets.ModelViewSet):
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if not page:
+            self.get_parent()
+        return page
+
+
+class ReviewViewSet(ConditionalGetMixin, ParentCheckMixin,
+                    viewsets.ModelViewSet):
     http_method_names = ['get', 'post', 'patch', 'delete']
     permission_classes = (IsAuthenticatedOrReadOnly,
                           IsOwnerAdminModeratorOrReadOnly)
+    pagination_class = PageNumberOrCursorPagination
+    cursor_ordering = ('pub_date', 'id')
+    versioned_models = (Review, Comment, User)
     serializer_class = ReviewSerializer
+    throttle_scope = 'reviews'
+
+    def get_serializer_class(self):
+        if self.request.method in SAFE_METHODS:
+            return ReviewReadSerializer
+        return super().get_serializer_class()
 
-    def _get_title(self):
+    def get_parent(self):
         title_id = self.kwargs.get("title_id")
         return get_object_or_404(Title, id=title_id)
 
     def get_queryset(self):
-        title = self._get_title()
-        return title.reviews.all()
+        return Review.objects.filter(
+            title_id=self.kwargs.get("title_id")
+        ).select_related('author')
 
     def perform_create(self, serializer):
-        title = self._get_title()
+        title = self.get_parent()
         serializer.save(author=self.request.user, title=title)
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ConditionalGetMixin, ParentCheckMixin,
+                     viewsets.ModelViewSet):
     http_method_names = ['get', 'post', 'patch', 'delete']
     permission_classes = (IsAuthenticatedOrReadOnly,
                           IsOwnerAdminModeratorOrReadOnly)
+    pagination_class = PageNumberOrCursorPagination
+    cursor_ordering = ('pub_date', 'id')
+    versioned_models = (Comment, User)
     serializer_class = CommentSerializer
-
-    def _get_title(self):
-        title_id = self.kwargs.get("title_id")
-        return get_object_or_404(Title, id=title_id)
-
-    def _get_review(self):
-        review_id = self.kwargs.get("review_id")
-        return get_object_or_404(Review, id=review_id)
+    throttle_scope = 'comments'
+
+    def get_serializer_class(self):
+        if self.request.method in SAFE_METHODS:
+            return CommentReadSerializer
+        return super().get_serializer_class()
+
+    def get_parent(self):
+        """
+        Review from the URL, found only if it belongs to the title from
+        the URL. One primary key lookup, cached for the request.
+
+        """
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review,
+                id=self.kwargs.get("review_id"),
+                title_id=self.kwargs.get("title_id"),
+            )
+        return self._review
 
     def get_queryset(self):
-        review = self._get_review()
-        return review.comments.all()
+        return Comment.objects.filter(
+            review_id=self.kwargs.get("review_id"),
+            review__title_id=self.kwargs.get("title_id"),
+        ).select_related('author')
 
     def perform_create(self, serializer):
-        title = self._get_title()
-        review = self._get_review()
-        if review.title == title:
-            serializer.save(author=self.request.user, review=review)
+        serializer.save(author=self.request.user, review=self.get_parent())
+
+
+def create_confirmation_code(user):
+    """Create confirmation_code and queue it for sending."""
+
+    created = user.pk is None
+    with transaction.atomic():
+        if created:
+            user.save()
+        code = issue_code(user, created=created)
+        queue_email(
+            'Registration in the YaMDb project.',
+            f'Your confirmation code {code}.',
+            settings.ADMIN_EMAIL,
+            user.email,
+        )
 
 
-def create_confirmation_code(username):
-    """Create and sent confirmation_code for registration."""
+def get_signup_conflict(users, username, email):
+    """
+    Returns the error for users clashing with the signup data, if any.
 
-    confirmation_code = ''.join(sample(hexdigits, 6))
-    user = get_object_or_404(User, username=username)
-    user.confirmation_code = confirmation_code
-    user.save()
+    A taken username is reported before a taken email, whatever order
+    the users come in.
 
-    subject = 'Registration in the YaMDb project.'
-    message = f'Your confirmation code {confirmation_code}.'
-    from_email = settings.ADMIN_EMAIL
-    to_email = [user.email]
-    return send_mail(subject, message, from_email, to_email)
+    """
+    if any(user.username == username and user.email != email
+           for user in users):
+        return 'Username is incorrect!'
+    if any(user.email == email and user.username != username
+           for user in users):
+        return 'Email is incorrect!'
+    return None
 
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes(
+    [AuthBucketThrottle, SignupUsernameThrottle, SignupIPThrottle]
+)
 def signup(request):
     """Creates a new user and sends a confirmation code to email."""
 
-    serializer = SignUpSerializer(data=request.data)
     email = request.data.get('email')
-    user = User.objects.filter(email=email)
     username = request.data.get('username')
+    users = list(
+        User.objects.filter(Q(username=username) | Q(email=email))[:2]
+    )
+    conflict = get_signup_conflict(users, username, email)
+    if conflict:
+        return Response(conflict, status=status.HTTP_400_BAD_REQUEST)
 
-    if User.objects.filter(username=username).exists():
-        if User.objects.filter(username=username).first().email != email:
-            return Response(
-                'Username is incorrect!', status=status.HTTP_400_BAD_REQUEST)
-
-    if user.exists():
-        if username != user.first().username:
-            return Response(
-                'Email is incorrect!', status=status.HTTP_400_BAD_REQUEST
-            )
-        user = user.get(email=email)
-        create_confirmation_code(user.username)
+    if users:
+        create_confirmation_code(users[0])
         return Response(
             {'message': 'User with this email exists.'
              'Verification code sent again.'
@@ -140,29 +289,53 @@ def signup(request):
             status=status.HTTP_200_OK
         )
 
-    else:
-        serializer.is_valid(raise_exception=True)
-        email = serializer.validated_data.get('email')
-        username = serializer.validated_data.get('username')
-        user = User.objects.get_or_create(username=username, email=email)
-        create_confirmation_code(username)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+    serializer = SignUpSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    try:
+        create_confirmation_code(User(**serializer.validated_data))
+    except IntegrityError:
+        # A concurrent signup took the username or email in the meantime.
+        return Response(
+            'Username or email is already taken!',
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes(
+    [AuthBucketThrottle, TokenUsernameThrottle, TokenIPThrottle]
+)
 def get_token(request):
     serializer = TokenSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
-    user = get_object_or_404(User, username=request.data['username'])
-    confirmation_code = serializer.data.get('confirmation_code')
-    if confirmation_code == str(user.confirmation_code):
-        return Response(f'token: {AccessToken.for_user(user)}',
-                        status=status.HTTP_200_OK)
-    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    user = serializer.validated_data['user']
+    return Response(f'token: {get_access_token(user)}',
+                    status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminOnly])
+def export_data(request, model):
+    """Streams all titles, reviews or comments as csv or ndjson."""
+    if model not in EXPORTS:
+        raise Http404
+    output = request.query_params.get('output', 'csv')
+    if output not in EXPORT_FORMATS:
+        raise ValidationError(
+            {'output': [f'Choose one of {", ".join(EXPORT_FORMATS)}.']}
+        )
+    response = StreamingHttpResponse(
+        stream_export(model, output), content_type=EXPORT_FORMATS[output]
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{model}.{output}"'
+    )
+    return response
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet for viewing users and editing user data."""
 
     lookup_field = 'username'
@@ -172,6 +345,31 @@ class UserViewSet(viewsets.ModelViewSet):
     permission_classes = (IsAdminOnly,)
     filter_backends = (SearchFilter,)
     search_fields = ('username',)
+    pagination_class = PageNumberOrCursorPagination
+    cursor_ordering = ('id',)
+    versioned_models = (User,)
+
+    @action(
+        detail=True,
+        url_path='activity',
+        permission_classes=[IsModeratorOrAdmin],
+    )
+    def activity(self, request, username=None):
+        """
+        Reviews and comments of the user across all titles, newest first,
+        merged page by page from both tables.
+
+        """
+        user = get_object_or_404(User.objects.only('id'), username=username)
+        paginator = MergedFeedPagination()
+        page = paginator.paginate_sources((
+            Review.objects.filter(author=user),
+            Comment.objects.filter(author=user).annotate(
+                title_id=F('review__title_id')
+            ),
+        ), request)
+        serializer = ActivityReadSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
     @action(
         methods=['GET', 'PATCH'],
@@ -184,7 +382,9 @@ class UserViewSet(viewsets.ModelViewSet):
         editing information about himself."""
 
         if request.method == 'GET':
-            serializer = UserSerializer(request.user)
+            serializer = UserSerializer(
+                get_object_or_404(User, pk=request.user.pk)
+            )
             return Response(serializer.data, status=status.HTTP_200_OK)
 
         if request.method == 'PATCH':
@@ -102,12 +102,49 @@ STATIC_URL = '/static/'
 
 STATICFILES_DIRS = ((BASE_DIR / 'static/'),)
 CSV_DATA_PATH = BASE_DIR / 'static/data/'
+DATA_MANIFEST = CSV_DATA_PATH / 'manifest.json'
+EXPORT_CHUNK_SIZE = 2000
 
 AUTH_USER_MODEL = 'users.User'
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'throttle': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'throttle',
+    },
+    # State every process must agree on: model versions, response cache
+    # stats and auth stamps. Files are shared by the processes of one host,
+    # point it to memcached or redis when running on several hosts.
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'shared_cache',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+RESPONSE_CACHE_TIMEOUT = 60 * 5
+# Hits and misses are counted in memory and added to the `shared` cache
+# every RESPONSE_CACHE_STATS_BATCH requests or INTERVAL seconds.
+RESPONSE_CACHE_STATS_BATCH = 100
+RESPONSE_CACHE_STATS_INTERVAL = 10
+
+LEADERBOARD_SIZE = 20
+LEADERBOARD_MAX_SIZE = 100
+LEADERBOARD_MIN_REVIEWS = 3
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+EMAIL_OUTBOX_BATCH_SIZE = 50
+EMAIL_OUTBOX_WORKERS = 4
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_BACKOFF = 30
+# A claim on outbox rows lasts EMAIL_OUTBOX_LEASE seconds, keep the SMTP
+# timeout well below it so a hung send does not outlive the claim.
+EMAIL_OUTBOX_LEASE = 60 * 5
+EMAIL_TIMEOUT = 10
 
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
@@ -116,14 +153,54 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ],
+    # Throttles key clients on REMOTE_ADDR; set to the number of trusted
+    # proxies to read the client address from X-Forwarded-For instead.
+    'NUM_PROXIES': 0,
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.TokenBucketThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'signup_username': '5/hour',
+        'signup_ip': '30/hour',
+        'token_username': '10/hour',
+        'token_ip': '30/hour',
+    },
 }
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=14),
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
+# Token buckets of the views by throttle scope and role, see
+# api.throttling.TokenBucketThrottle. Point the `throttle` cache to a shared
+# backend to share the buckets between worker processes.
+THROTTLE_READ_BUCKETS = {
+    'anon': '300/min', 'user': '600/min',
+    'moderator': '1200/min', 'admin': '3000/min',
+}
+THROTTLE_WRITE_BUCKETS = {
+    'user': '30/min', 'moderator': '120/min', 'admin': '300/min',
+}
+THROTTLE_BUCKETS = {
+    'titles': THROTTLE_READ_BUCKETS,
+    'titles_write': THROTTLE_WRITE_BUCKETS,
+    'reviews': THROTTLE_READ_BUCKETS,
+    'reviews_write': THROTTLE_WRITE_BUCKETS,
+    'comments': THROTTLE_READ_BUCKETS,
+    'comments_write': THROTTLE_WRITE_BUCKETS,
+    'auth': {
+        'anon': '60/min', 'user': '60/min',
+        'moderator': '120/min', 'admin': '300/min',
+    },
+}
+AUTH_TOKEN_CACHE_SIZE = 1024
+# Longest time a change made without model signals stays unnoticed by
+# tokens, see users.stamps.
+AUTH_STAMP_TIMEOUT = 30
+CONFIRMATION_CODE_TTL = 60 * 60
+CONFIRMATION_CODE_MAX_ATTEMPTS = 5
 
 LIMIT_EMAIL = 254
 LIMIT_USERNAME = 150
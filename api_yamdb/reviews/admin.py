@@ -1,6 +1,7 @@
 from django.contrib import admin
 
 from .models import Category, Comment, Genre, Title, Review, User
+from .search import search_titles
 
 
 class GenreAdmin(admin.ModelAdmin):
@@ -29,6 +30,12 @@ class TitleAdmin(admin.ModelAdmin):
     list_filter = ('name', 'year')
     empty_value_display = '-empty-'
 
+    def get_search_results(self, request, queryset, search_term):
+        """Search titles through the full-text index."""
+        if not search_term:
+            return queryset, False
+        return search_titles(queryset, search_term), False
+
 
 class ReviewAdmin(admin.ModelAdmin):
     list_display = (
@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class ReviewsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'reviews'
+
+    def ready(self):
+        from reviews.signals import (bump_all_versions,
+                                     restore_title_search_index)
+        post_migrate.connect(bump_all_versions, sender=self)
+        post_migrate.connect(restore_title_search_index, sender=self)
@@ -0,0 +1,129 @@
+"""
+Streaming export of the catalogue.
+
+Rows are read with `values()` so foreign keys resolve through joins, and
+with `iterator()` so memory stays flat however large the table is.
+
+"""
+import csv
+import json
+from collections import namedtuple
+from datetime import date, datetime
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from reviews.loading import batched
+from reviews.models import Comment, Review, Title
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+}
+
+Export = namedtuple('Export', 'model columns')
+
+# Column name and the `values()` lookup it is read from.
+EXPORTS = {
+    'titles': Export(Title, (
+        ('id', 'id'),
+        ('name', 'name'),
+        ('year', 'year'),
+        ('description', 'description'),
+        ('category', 'category__slug'),
+        ('review_count', 'review_count'),
+        ('average_score', 'average_score'),
+    )),
+    'reviews': Export(Review, (
+        ('id', 'id'),
+        ('title_id', 'title_id'),
+        ('text', 'text'),
+        ('author', 'author__username'),
+        ('score', 'score'),
+        ('pub_date', 'pub_date'),
+    )),
+    'comments': Export(Comment, (
+        ('id', 'id'),
+        ('title_id', 'review__title_id'),
+        ('review_id', 'review_id'),
+        ('text', 'text'),
+        ('author', 'author__username'),
+        ('pub_date', 'pub_date'),
+    )),
+}
+
+encoder = DjangoJSONEncoder()
+
+
+def get_columns(name):
+    columns = [column for column, _ in EXPORTS[name].columns]
+    if name == 'titles':
+        columns.append('genre')
+    return columns
+
+
+def add_title_genres(rows):
+    """Add the genre slugs to a chunk of title rows with one query."""
+    genres = {row['id']: [] for row in rows}
+    for title_id, slug in Title.genre.through.objects.filter(
+        title_id__in=genres
+    ).order_by('genre__slug').values_list('title_id', 'genre__slug'):
+        genres[title_id].append(slug)
+    for row in rows:
+        row['genre'] = genres[row['id']]
+    return rows
+
+
+def iter_rows(name, chunk_size=None):
+    """Yield the rows of an export as dicts, ordered by id."""
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    export = EXPORTS[name]
+    rows = (
+        {column: values[lookup] for column, lookup in export.columns}
+        for values in export.model.objects.order_by('id').values(
+            *(lookup for _, lookup in export.columns)
+        ).iterator(chunk_size=chunk_size)
+    )
+    if name != 'titles':
+        yield from rows
+        return
+    for chunk in batched(rows, chunk_size):
+        yield from add_title_genres(chunk)
+
+
+def format_value(value):
+    if isinstance(value, (date, datetime)):
+        return encoder.default(value)
+    if isinstance(value, list):
+        return ','.join(value)
+    return '' if value is None else value
+
+
+class Echo:
+    """File-like object handing written lines back to the csv writer."""
+
+    def write(self, value):
+        return value
+
+
+def render_csv(name, rows):
+    columns = get_columns(name)
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow(format_value(row[column]) for column in columns)
+
+
+def render_ndjson(name, rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + (
+            '\n'
+        )
+
+
+RENDERERS = {'csv': render_csv, 'ndjson': render_ndjson}
+
+
+def stream_export(name, output='csv', chunk_size=None):
+    """Yield an export rendered as csv or ndjson, line by line."""
+    return RENDERERS[output](name, iter_rows(name, chunk_size))
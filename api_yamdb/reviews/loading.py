@@ -0,0 +1,651 @@
+"""
+Bulk loading of model rows from data files.
+
+Rows are validated without touching the database, inserted with
+`bulk_create` in batches, one transaction per batch, and rows that fail
+validation or constraints are collected into a reject file.
+
+"""
+import csv
+import gzip
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import time
+from collections import defaultdict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from itertools import islice
+from pathlib import Path
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+
+
+DATA_FORMATS = ('.csv', '.jsonl')
+
+
+def open_text(path):
+    """Open a data file for reading as text, gzipped files are streamed."""
+    if Path(path).suffix == '.gz':
+        return gzip.open(path, 'rt', encoding='utf-8', newline='')
+    return open(path, 'r', encoding='utf-8', newline='')
+
+
+def get_data_format(path):
+    """Format of a data file by its extension, ignoring `.gz`."""
+    suffixes = Path(path).suffixes
+    if suffixes and suffixes[-1] == '.gz':
+        suffixes = suffixes[:-1]
+    data_format = suffixes[-1] if suffixes else ''
+    if data_format not in DATA_FORMATS:
+        raise ValueError(f'Unsupported data file {path}.')
+    return data_format
+
+
+def read_rows(path):
+    """Yield the rows of a csv or jsonl file, optionally gzipped, as dicts."""
+    data_format = get_data_format(path)
+    with open_text(path) as file:
+        if data_format == '.csv':
+            yield from csv.DictReader(file, delimiter=',')
+            return
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_manifest(path):
+    """
+    Read the data files listed in a JSON manifest.
+
+    The manifest looks like `{"files": [{"model": "reviews.Title",
+    "path": "titles.csv.gz"}]}`, relative paths start at its directory.
+
+    """
+    from django.apps import apps
+
+    path = Path(path)
+    with open(path, encoding='utf-8') as file:
+        manifest = json.load(file)
+    return [
+        DataFile(apps.get_model(entry['model']), path.parent / entry['path'])
+        for entry in manifest['files']
+    ]
+
+
+def batched(rows, size):
+    """Split an iterable into lists of at most `size` items."""
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+class RejectWriter:
+    """Write rejected rows with their errors, the file is created lazily."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.file = None
+        self.writer = None
+        self.count = 0
+
+    def write(self, row, error):
+        if self.writer is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.file = open(self.path, 'w', encoding='utf-8', newline='')
+            self.writer = csv.DictWriter(
+                self.file, fieldnames=[*row.keys(), 'error'],
+                extrasaction='ignore',
+            )
+            self.writer.writeheader()
+        self.writer.writerow({**row, 'error': error})
+        self.count += 1
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+
+class LoadResult:
+    """Counters of a single file load."""
+
+    def __init__(self, model):
+        self.model = model
+        self.loaded = 0
+        self.rejected = 0
+        self.skipped_batches = 0
+        self.unchanged = False
+        self.seconds = 0.0
+        self.rejects = None
+        self.touched = defaultdict(set)
+
+    @property
+    def rows_per_second(self):
+        total = self.loaded + self.rejected
+        return total / self.seconds if self.seconds else float(total)
+
+    def __str__(self):
+        if self.unchanged:
+            return f'{self.model.__name__}: file is unchanged, skipped'
+        skipped = (
+            f', {self.skipped_batches} unchanged batches skipped'
+            if self.skipped_batches else ''
+        )
+        return (
+            f'{self.model.__name__}: {self.loaded} rows loaded, '
+            f'{self.rejected} rejected{skipped} in {self.seconds:.2f}s '
+            f'({self.rows_per_second:.0f} rows/sec)'
+        )
+
+
+PreparedBatch = namedtuple('PreparedBatch', 'number checksum entries')
+
+
+def file_checksum(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def batch_checksum(rows):
+    digest = hashlib.sha256()
+    for row in rows:
+        digest.update(json.dumps(row, ensure_ascii=False).encode())
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+class BulkLoader:
+    """
+    Load rows of one model with `bulk_create`.
+
+    Foreign keys are checked against the ids of the referenced tables
+    loaded once per file, so no row costs a query of its own. In the
+    upsert mode rows with existing primary keys are updated instead.
+
+    """
+
+    def __init__(self, model, batch_size=1000, rejects=None, upsert=False):
+        self.model = model
+        self.batch_size = batch_size
+        self.rejects = rejects
+        self.upsert = upsert
+        self.fields = {}
+        for field in model._meta.concrete_fields:
+            self.fields[field.name] = field
+            self.fields[field.attname] = field
+        self.foreign_keys = [
+            field for field in model._meta.concrete_fields
+            if field.many_to_one
+        ]
+        self.auto_dates = [
+            field for field in model._meta.concrete_fields
+            if getattr(field, 'auto_now_add', False)
+        ]
+        self.known_ids = {}
+
+    def load_known_ids(self):
+        self.known_ids = {
+            field.attname: set(
+                field.related_model._default_manager.values_list(
+                    field.target_field.attname, flat=True
+                )
+            )
+            for field in self.foreign_keys
+        }
+
+    def build_instance(self, row):
+        """
+        Turn a row into a validated, unsaved model instance.
+
+        Only the values are checked here, existence of the referenced rows
+        is checked by `check_foreign_keys` right before writing.
+
+        """
+        values = {}
+        for column, value in row.items():
+            field = self.fields.get(column)
+            if field is None:
+                raise ValidationError(f'Unknown column {column}.')
+            if value in ('', None) and field.null:
+                value = None
+            values[field.attname] = value
+        instance = self.model(**values)
+        if hasattr(instance, 'set_unusable_password') and not (
+            instance.password
+        ):
+            instance.set_unusable_password()
+        instance.clean_fields(
+            exclude=[field.name for field in self.foreign_keys]
+        )
+        for field in self.foreign_keys:
+            value = getattr(instance, field.attname)
+            if value is None:
+                if not field.null:
+                    raise ValidationError(f'{field.attname} is required.')
+                continue
+            setattr(
+                instance, field.attname, field.target_field.to_python(value)
+            )
+        return instance
+
+    def check_foreign_keys(self, instance):
+        for field in self.foreign_keys:
+            value = getattr(instance, field.attname)
+            if value is not None and (
+                value not in self.known_ids[field.attname]
+            ):
+                raise ValidationError(
+                    f'{field.attname}={value} does not exist.'
+                )
+
+    def prepare_batch(self, rows):
+        """Validate rows into `(row, instance, error)` triples."""
+        prepared = []
+        for row in rows:
+            try:
+                prepared.append((row, self.build_instance(row), None))
+            except (ValidationError, ValueError, TypeError) as error:
+                prepared.append((row, None, str(error)))
+        return prepared
+
+    def prepare_batches(self, rows, skip_checksums=None):
+        """
+        Split rows into prepared batches.
+
+        Batches whose checksum matches the one recorded for their number
+        in `skip_checksums` are not validated and have no entries.
+
+        """
+        skip_checksums = skip_checksums or {}
+        for number, rows_batch in enumerate(batched(rows, self.batch_size)):
+            checksum = batch_checksum(rows_batch)
+            if skip_checksums.get(number) == checksum:
+                yield PreparedBatch(number, checksum, None)
+            else:
+                yield PreparedBatch(
+                    number, checksum, self.prepare_batch(rows_batch)
+                )
+
+    def reject(self, row, error, result):
+        result.rejected += 1
+        if self.rejects is not None:
+            self.rejects.write(row, error)
+
+    def touch(self, instances, result):
+        """Remember the parents of written rows to refresh their state."""
+        for field in self.foreign_keys:
+            result.touched[field.attname].update(
+                getattr(instance, field.attname) for instance in instances
+            )
+
+    def insert(self, instances):
+        """
+        `bulk_create` the instances keeping the dates read from the file.
+
+        Inserting sets `auto_now_add` fields to now(), the file values are
+        written back with one more query, as the upsert mode writes them.
+
+        """
+        dates = [
+            (instance, [getattr(instance, field.attname)
+                        for field in self.auto_dates])
+            for instance in instances
+            if instance.pk is not None
+        ]
+        self.model._default_manager.bulk_create(instances)
+        if not self.auto_dates or not dates:
+            return
+        for instance, values in dates:
+            for field, value in zip(self.auto_dates, values):
+                if value is not None:
+                    setattr(instance, field.attname, value)
+        self.model._default_manager.bulk_update(
+            [instance for instance, _ in dates],
+            [field.name for field in self.auto_dates],
+        )
+
+    def write_batch(self, batch, result):
+        """Insert a batch in one transaction, row by row if it fails."""
+        if not batch:
+            return
+        try:
+            with transaction.atomic():
+                self.insert([instance for _, instance in batch])
+            result.loaded += len(batch)
+            self.touch([instance for _, instance in batch], result)
+            return
+        except IntegrityError:
+            pass
+        for row, instance in batch:
+            try:
+                with transaction.atomic():
+                    self.insert([instance])
+                result.loaded += 1
+                self.touch([instance], result)
+            except IntegrityError as error:
+                self.reject(row, error, result)
+
+    def get_update_fields(self, row):
+        """Fields updated from the row, an empty password is kept as is."""
+        fields = {
+            self.fields[column].name for column in row
+        } - {self.model._meta.pk.name}
+        if 'password' in fields and not row['password']:
+            fields.remove('password')
+        return tuple(sorted(fields))
+
+    def update_batch(self, batch, fields, result):
+        """
+        Update a batch in one transaction, row by row if it fails.
+
+        Return the updated instances.
+
+        """
+        manager = self.model._default_manager
+        instances = [instance for _, instance in batch]
+        if not fields:
+            return instances
+        try:
+            with transaction.atomic():
+                manager.bulk_update(instances, fields)
+            return instances
+        except IntegrityError:
+            pass
+        updated = []
+        for row, instance in batch:
+            try:
+                with transaction.atomic():
+                    manager.bulk_update([instance], fields)
+                updated.append(instance)
+            except IntegrityError as error:
+                self.reject(row, error, result)
+        return updated
+
+    def upsert_batch(self, batch, result):
+        """Update the rows with existing primary keys, insert the rest."""
+        manager = self.model._default_manager
+        attnames = [field.attname for field in self.foreign_keys]
+        existing = {
+            values[0]: values[1:]
+            for values in manager.filter(
+                pk__in=[instance.pk for _, instance in batch]
+            ).values_list('pk', *attnames)
+        }
+        by_fields = defaultdict(list)
+        for row, instance in batch:
+            if instance.pk in existing:
+                by_fields[self.get_update_fields(row)].append((row, instance))
+        updated = []
+        for fields, group in by_fields.items():
+            updated.extend(self.update_batch(group, fields, result))
+        if updated:
+            result.loaded += len(updated)
+            self.touch(updated, result)
+            for old_values in map(existing.get, (i.pk for i in updated)):
+                for attname, value in zip(attnames, old_values):
+                    result.touched[attname].add(value)
+        self.write_batch(
+            [(row, instance) for row, instance in batch
+             if instance.pk not in existing],
+            result,
+        )
+
+    def write_prepared(self, prepared, result):
+        """Write valid entries of a batch, return False if any is rejected."""
+        batch = []
+        rejected = result.rejected
+        for row, instance, error in prepared:
+            if error is None:
+                try:
+                    self.check_foreign_keys(instance)
+                except ValidationError as fk_error:
+                    error = fk_error
+            if error is not None:
+                self.reject(row, error, result)
+            else:
+                batch.append((row, instance))
+        if self.upsert and batch:
+            self.upsert_batch(batch, result)
+        else:
+            self.write_batch(batch, result)
+        return result.rejected == rejected
+
+    def load_prepared(self, prepared_batches):
+        """
+        Write prepared batches and return the load result.
+
+        `result.checksums` maps the numbers of the batches written without
+        rejects, or skipped as unchanged, to their checksums.
+
+        """
+        result = LoadResult(self.model)
+        result.checksums = {}
+        started = time.perf_counter()
+        self.load_known_ids()
+        for batch in prepared_batches:
+            if batch.entries is None:
+                result.skipped_batches += 1
+                result.checksums[batch.number] = batch.checksum
+            elif self.write_prepared(batch.entries, result):
+                result.checksums[batch.number] = batch.checksum
+        result.seconds = time.perf_counter() - started
+        return result
+
+    def load(self, rows, skip_checksums=None):
+        """Load an iterable of row dicts and return the load result."""
+        return self.load_prepared(self.prepare_batches(rows, skip_checksums))
+
+
+class DataFile(namedtuple('DataFile', 'model path')):
+    """A data file with the rows of one model."""
+
+    @property
+    def key(self):
+        return str(Path(self.path).resolve())
+
+    @property
+    def rejects_name(self):
+        return f'{Path(self.path).name.split(".")[0]}.rejects.csv'
+
+
+def dependency_order(models):
+    """
+    Sort models so that every model follows the models it references.
+
+    Foreign keys to models outside of `models` and to the model itself
+    are ignored.
+
+    """
+    models = list(models)
+    dependencies = {
+        model: {
+            field.related_model for field in model._meta.concrete_fields
+            if field.many_to_one
+            and field.related_model in models
+            and field.related_model is not model
+        }
+        for model in models
+    }
+    ordered = []
+    while dependencies:
+        ready = [
+            model for model in models
+            if model in dependencies
+            and dependencies[model].issubset(ordered)
+        ]
+        if not ready:
+            raise ValueError(
+                'Circular foreign keys between '
+                f'{", ".join(model.__name__ for model in dependencies)}.'
+            )
+        for model in ready:
+            ordered.append(model)
+            del dependencies[model]
+    return ordered
+
+
+def setup_worker():
+    """Set up Django in a worker process started without fork."""
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+
+def prepare_file(model_label, path, batch_size, spool_dir,
+                 skip_checksums=None):
+    """
+    Parse and validate a file in a worker process.
+
+    Prepared batches are pickled into a spool file one by one to keep
+    memory bounded, the path of the spool file is returned.
+
+    """
+    from django.apps import apps
+
+    loader = BulkLoader(apps.get_model(model_label), batch_size)
+    with tempfile.NamedTemporaryFile(
+        'wb', dir=spool_dir, suffix='.spool', delete=False
+    ) as spool:
+        for batch in loader.prepare_batches(
+            read_rows(path), skip_checksums
+        ):
+            pickle.dump(batch, spool, pickle.HIGHEST_PROTOCOL)
+    return spool.name
+
+
+def read_spool(path):
+    with open(path, 'rb') as spool:
+        while True:
+            try:
+                yield pickle.load(spool)
+            except EOFError:
+                return
+
+
+def get_loaded_checksums(data_file):
+    """Recorded checksums of a file and of its batches."""
+    from reviews.models import LoadedFile
+
+    loaded_file = LoadedFile.objects.filter(path=data_file.key).first()
+    if loaded_file is None:
+        return None, {}
+    return loaded_file.checksum, dict(
+        loaded_file.batches.values_list('number', 'checksum')
+    )
+
+
+def save_loaded_checksums(data_file, checksum, result):
+    """Record the checksums of a file load, the file's only if complete."""
+    from reviews.models import LoadedBatch, LoadedFile
+
+    with transaction.atomic():
+        loaded_file, _ = LoadedFile.objects.update_or_create(
+            path=data_file.key,
+            defaults={'checksum': checksum if not result.rejected else ''},
+        )
+        loaded_file.batches.all().delete()
+        LoadedBatch.objects.bulk_create(
+            LoadedBatch(file=loaded_file, number=number, checksum=value)
+            for number, value in result.checksums.items()
+        )
+
+
+def load_files(data_files, rejects_dir, batch_size=1000, workers=1,
+               incremental=False):
+    """
+    Load data files in foreign key order, yielding a result per file.
+
+    With several workers the files are parsed and validated in a process
+    pool all at once, while writes stay in this process, one file at a
+    time, so the database sees a single writer.
+
+    In the incremental mode files and batches with the checksums recorded
+    by the previous load are skipped and changed rows are upserted.
+
+    """
+    by_model = {data_file.model: data_file for data_file in data_files}
+    ordered = [by_model[model] for model in dependency_order(by_model)]
+    checksums = {}
+    skip_checksums = {}
+    for data_file in ordered:
+        if incremental:
+            checksum = file_checksum(data_file.path)
+            loaded_checksum, batches = get_loaded_checksums(data_file)
+            if loaded_checksum != checksum:
+                checksums[data_file] = checksum
+                skip_checksums[data_file] = batches
+    with ExitStack() as stack:
+        if workers > 1:
+            spool_dir = stack.enter_context(tempfile.TemporaryDirectory())
+            executor = stack.enter_context(ProcessPoolExecutor(
+                workers, initializer=setup_worker
+            ))
+            futures = {
+                data_file: executor.submit(
+                    prepare_file, data_file.model._meta.label,
+                    data_file.path, batch_size, spool_dir,
+                    skip_checksums.get(data_file),
+                )
+                for data_file in ordered
+                if not incremental or data_file in checksums
+            }
+        for data_file in ordered:
+            if incremental and data_file not in checksums:
+                result = LoadResult(data_file.model)
+                result.unchanged = True
+                yield result
+                continue
+            rejects = RejectWriter(Path(rejects_dir) / data_file.rejects_name)
+            loader = BulkLoader(
+                data_file.model, batch_size, rejects, upsert=incremental
+            )
+            try:
+                if workers > 1:
+                    spool = futures[data_file].result()
+                    result = loader.load_prepared(read_spool(spool))
+                    os.remove(spool)
+                else:
+                    result = loader.load(
+                        read_rows(data_file.path),
+                        skip_checksums.get(data_file),
+                    )
+            finally:
+                rejects.close()
+            if incremental:
+                save_loaded_checksums(data_file, checksums[data_file], result)
+            result.rejects = rejects
+            yield result
+
+
+def refresh_derived_state(title_ids=None, review_ids=None):
+    """
+    Bring state maintained by signals up to date after a bulk load,
+    bulk inserts do not send them.
+
+    Only the counters of `title_ids` and `review_ids` are rebuilt when
+    they are given.
+
+    """
+    from reviews.models import Review, Title
+    from reviews.signals import bump_all_versions
+
+    titles = Title.objects.all()
+    reviews = Review.objects.all()
+    if title_ids is not None:
+        titles = titles.filter(pk__in=title_ids)
+    if review_ids is not None:
+        reviews = reviews.filter(pk__in=review_ids)
+    titles.rebuild_review_stats()
+    reviews.rebuild_comment_counts()
+    bump_all_versions()
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from reviews.export import EXPORT_FORMATS, EXPORTS, stream_export
+
+
+class Command(BaseCommand):
+    help = 'Streams titles, reviews or comments as csv or ndjson.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', choices=sorted(EXPORTS))
+        parser.add_argument(
+            '--format', choices=sorted(EXPORT_FORMATS), default='csv',
+            help='Output format.',
+        )
+        parser.add_argument(
+            '--output', help='File to write to, stdout by default.',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int,
+            help='Rows fetched from the database at a time.',
+        )
+
+    def handle(self, *args, **options):
+        lines = stream_export(
+            options['model'], options['format'], options['chunk_size']
+        )
+        if options['output'] is None:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(options['output'], 'w', encoding='utf-8',
+                  newline='') as file:
+            file.writelines(lines)
+        self.stderr.write(f'Exported {options["model"]} to '
+                          f'{options["output"]}.')
@@ -1,46 +1,100 @@
-import csv
+import time
+from pathlib import Path
 
 from django.core.management.base import BaseCommand
-from django.apps import apps
 from django.conf import settings
 
-MODEL_FILE = {
-    'apps': {
-        "users": {'User': 'users.csv'},
-        "reviews": {
-            'Category': 'category.csv',
-            'Genre': 'genre.csv',
-            'Title': 'titles.csv',
-            'Title_genre': 'genre_title.csv',
-            'Review': 'review.csv',
-            'Comment': 'comments.csv'
-        }
-    }
-}
-
-CSV_DATA_PATH = settings.CSV_DATA_PATH
+from reviews.loading import (load_files, read_manifest, read_rows,
+                             refresh_derived_state)
+from reviews.models import Comment, Review
 
 
 class Command(BaseCommand):
-    help = 'Prepolutes db from csv files.'
-
-    def _load_csv(self, file_path, model):
-        """Load data from a csv file into a db table."""
-        with open(file_path, 'r', encoding='utf-8') as file:
-            data = csv.DictReader(file, delimiter=',')
-            self.stdout.write(f'Loading {model}')
-            for row in data:
-                try:
-                    model_instance = model(**row)
-                    model_instance.save()
-                except Exception as er:
-                    self.stdout.write(f'{row} - {er}', ending='\n\n')
-            self.stdout.write(f'{model} loading  is complete', ending='\n\n')
+    help = 'Prepolutes db from csv and jsonl files, optionally gzipped.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--manifest', type=Path, default=settings.DATA_MANIFEST,
+            help='JSON manifest listing the data files and their models.',
+        )
+        parser.add_argument(
+            '--bulk', action='store_true',
+            help='Insert rows in batches with bulk_create.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Rows per batch in the bulk mode.',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Processes parsing files in parallel in the bulk mode.',
+        )
+        parser.add_argument(
+            '--incremental', action='store_true',
+            help=(
+                'Skip files and batches unchanged since the previous load '
+                'and upsert changed rows by primary key, implies --bulk.'
+            ),
+        )
+        parser.add_argument(
+            '--rejects-dir', type=Path, default=Path('rejects'),
+            help='Directory for the rows rejected in the bulk mode.',
+        )
+
+    def _build_instance(self, model, row):
+        """Model instance with the text values of the row converted."""
+        instance = model(**row)
+        for field in model._meta.concrete_fields:
+            value = getattr(instance, field.attname)
+            if isinstance(value, str):
+                setattr(instance, field.attname, field.to_python(value))
+        return instance
+
+    def _load_file(self, file_path, model):
+        """Load data from a data file into a db table."""
+        self.stdout.write(f'Loading {model}')
+        for row in read_rows(file_path):
+            try:
+                model_instance = self._build_instance(model, row)
+                model_instance.save()
+            except Exception as er:
+                self.stdout.write(f'{row} - {er}', ending='\n\n')
+        self.stdout.write(f'{model} loading  is complete', ending='\n\n')
+
+    def _bulk_load(self, data_files, options):
+        """Load data files in batches, rejecting bad rows."""
+        started = time.perf_counter()
+        total = 0
+        title_ids, review_ids = set(), set()
+        for result in load_files(
+            data_files, options['rejects_dir'], options['batch_size'],
+            options['workers'], options['incremental'],
+        ):
+            self.stdout.write(str(result))
+            if result.rejected:
+                self.stdout.write(
+                    f'Rejected rows are saved to {result.rejects.path}'
+                )
+            total += result.loaded + result.rejected
+            if result.model is Review:
+                title_ids |= result.touched['title_id']
+            if result.model is Comment:
+                review_ids |= result.touched['review_id']
+        if not options['incremental']:
+            refresh_derived_state()
+        elif total:
+            refresh_derived_state(title_ids, review_ids)
+        seconds = time.perf_counter() - started
+        self.stdout.write(
+            f'{total} rows processed in {seconds:.2f}s '
+            f'({total / seconds:.0f} rows/sec)'
+        )
 
     def handle(self, *args, **options):
-        for app_name, data in MODEL_FILE['apps'].items():
-            for model_name, csv_file in data.items():
-                model = apps.get_model(app_name, model_name)
-                file_path = CSV_DATA_PATH / csv_file
-                self._load_csv(file_path, model)
+        data_files = read_manifest(options['manifest'])
+        if options['bulk'] or options['incremental']:
+            self._bulk_load(data_files, options)
+        else:
+            for model, file_path in data_files:
+                self._load_file(file_path, model)
         self.stdout.write('The db prepopulation is complete.')
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from reviews.models import Review, Title
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuilds the rating state of all titles from their reviews and '
+        'the comment counters of all reviews.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of titles or reviews updated per query.'
+        )
+
+    def handle(self, *args, **options):
+        count = Title.objects.all().rebuild_review_stats(
+            batch_size=options['batch_size']
+        )
+        self.stdout.write(f'Rating state of {count} titles is rebuilt.')
+        count = Review.objects.all().rebuild_comment_counts(
+            batch_size=options['batch_size']
+        )
+        self.stdout.write(f'Comment counters of {count} reviews are rebuilt.')
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.search import (create_search_index, is_search_index_supported,
+                            rebuild_search_index)
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the full-text search index of titles.'
+
+    def handle(self, *args, **options):
+        if not is_search_index_supported():
+            raise CommandError('Full-text index requires an SQLite database.')
+        create_search_index()
+        count = rebuild_search_index()
+        self.stdout.write(f'Search index of {count} titles is rebuilt.')
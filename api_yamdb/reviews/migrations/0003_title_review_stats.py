@@ -0,0 +1,37 @@
+# Generated by Django 3.2 on 2026-10-18 05:56
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def fill_review_stats(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    stats = Review.objects.values('title').annotate(
+        score_total=Sum('score'), total=Count('id')
+    )
+    for row in stats:
+        Title.objects.filter(pk=row['title']).update(
+            score_sum=row['score_total'], review_count=row['total']
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Number of reviews'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Sum of review scores'),
+        ),
+        migrations.RunPython(fill_review_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 3.2 on 2026-10-18 06:04
+
+from django.db import migrations, models
+from django.db.models import ExpressionWrapper, F, FloatField
+
+
+def fill_average_score(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Title.objects.filter(review_count__gt=0).update(
+        average_score=ExpressionWrapper(
+            F('score_sum') * 1.0 / F('review_count'),
+            output_field=FloatField(),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_title_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='average_score',
+            field=models.FloatField(editable=False, null=True, verbose_name='Average review score'),
+        ),
+        migrations.RunPython(fill_average_score, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['-average_score', '-review_count'], name='title_top_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', '-average_score', '-review_count'], name='title_top_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['year', '-average_score', '-review_count'], name='title_top_year_idx'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 3.2 on 2026-10-18 06:21
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def fill_keys(model, source, target):
+    last_pk = 0
+    while True:
+        batch = list(
+            model.objects.filter(pk__gt=last_pk).order_by('pk').only(
+                'pk', source
+            )[:BATCH_SIZE]
+        )
+        if not batch:
+            return
+        for instance in batch:
+            setattr(instance, target, getattr(instance, source).casefold())
+        model.objects.bulk_update(batch, (target,))
+        last_pk = batch[-1].pk
+
+
+def fill_lookup_keys(apps, schema_editor):
+    fill_keys(apps.get_model('reviews', 'Title'), 'name', 'name_key')
+    fill_keys(apps.get_model('reviews', 'Genre'), 'slug', 'slug_key')
+    fill_keys(apps.get_model('reviews', 'Category'), 'slug', 'slug_key')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_title_score_distribution'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='slug_key',
+            field=models.SlugField(default='', editable=False, verbose_name='Case-insensitive slug'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='genre',
+            name='slug_key',
+            field=models.SlugField(default='', editable=False, verbose_name='Case-insensitive slug'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='name_key',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=256, verbose_name='Case-insensitive name'),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', 'year'], name='title_category_year_idx'),
+        ),
+        migrations.RunPython(fill_lookup_keys, migrations.RunPython.noop),
+    ]
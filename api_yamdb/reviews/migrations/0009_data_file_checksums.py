@@ -0,0 +1,44 @@
+# Generated by Django 3.2 on 2026-10-18 06:18
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_normalized_lookup_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LoadedFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=1024, unique=True, verbose_name='Path')),
+                ('checksum', models.CharField(max_length=64, verbose_name='Checksum')),
+                ('loaded_at', models.DateTimeField(auto_now=True, verbose_name='Date loaded')),
+            ],
+            options={
+                'verbose_name': 'Loaded file',
+                'verbose_name_plural': 'Loaded files',
+            },
+        ),
+        migrations.CreateModel(
+            name='LoadedBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField(verbose_name='Number')),
+                ('checksum', models.CharField(max_length=64, verbose_name='Checksum')),
+                ('file', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='batches', to='reviews.loadedfile', verbose_name='File')),
+            ],
+            options={
+                'verbose_name': 'Loaded batch',
+                'verbose_name_plural': 'Loaded batches',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='loadedbatch',
+            constraint=models.UniqueConstraint(fields=('file', 'number'), name='unique_file_batch'),
+        ),
+    ]
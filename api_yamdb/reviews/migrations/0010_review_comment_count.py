@@ -0,0 +1,30 @@
+# Generated by Django 3.2 on 2026-10-18 06:30
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_comment_counts(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    Comment = apps.get_model('reviews', 'Comment')
+    counts = Comment.objects.values('review').annotate(total=Count('id'))
+    for row in counts:
+        Review.objects.filter(pk=row['review']).update(
+            comment_count=row['total']
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_data_file_checksums'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Number of comments'),
+        ),
+        migrations.RunPython(fill_comment_counts, migrations.RunPython.noop),
+    ]
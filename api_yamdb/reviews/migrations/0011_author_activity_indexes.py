@@ -0,0 +1,21 @@
+# Generated by Django 3.2 on 2026-10-18 06:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_review_comment_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['author', 'pub_date', 'id'], name='comment_author_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['author', 'pub_date', 'id'], name='review_author_pub_date_idx'),
+        ),
+    ]
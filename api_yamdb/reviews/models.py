@@ -1,12 +1,39 @@
+import math
+
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import (Case, Count, ExpressionWrapper, F, FloatField,
+                              When)
 
 from reviews.validators import validate_not_exceed_current_year
+from reviews.versions import bump_version
 from users.models import User
 
 
+class GroupQuerySet(models.QuerySet):
+    """Group queryset normalizing names and keys on bulk writes."""
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.name = obj.name.capitalize()
+            obj.slug_key = obj.slug.casefold()
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs, fields = list(objs), list(fields)
+        for obj in objs:
+            if 'name' in fields:
+                obj.name = obj.name.capitalize()
+            if 'slug' in fields:
+                obj.slug_key = obj.slug.casefold()
+        if 'slug' in fields and 'slug_key' not in fields:
+            fields.append('slug_key')
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+
 class GroupBaseModel(models.Model):
     """Group abstract model."""
     is_cleaned = False
@@ -21,6 +48,14 @@ class GroupBaseModel(models.Model):
         max_length=50,
         unique=True,
     )
+    slug_key = models.SlugField(
+        'Case-insensitive slug',
+        max_length=50,
+        db_index=True,
+        editable=False,
+    )
+
+    objects = GroupQuerySet.as_manager()
 
     class Meta:
         abstract = True
@@ -38,6 +73,7 @@ class GroupBaseModel(models.Model):
         if not self.is_cleaned:
             self.full_clean()
         self.name = self.name.capitalize()
+        self.slug_key = self.slug.casefold()
         super().save(*args, **kwargs)
 
 
@@ -57,12 +93,165 @@ class Category(GroupBaseModel):
         verbose_name_plural = "Categories"
 
 
-class Title(models.Model):
+SCORES = range(1, 11)
+
+
+def score_count_field(score):
+    """Name of the title field counting the reviews with the given score."""
+    return f'score_{score}_count'
+
+
+class TitleQuerySet(models.QuerySet):
+    """Title queryset with helpers for the persisted review stats."""
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """Fill the lookup keys, bulk inserts skip `Title.save()`."""
+        objs = list(objs)
+        for obj in objs:
+            obj.name_key = obj.name.casefold()
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs, fields = list(objs), list(fields)
+        if 'name' in fields:
+            for obj in objs:
+                obj.name_key = obj.name.casefold()
+            if 'name_key' not in fields:
+                fields.append('name_key')
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+    def update_review_stats(self, added_score=None, removed_score=None):
+        """
+        Add a review score to and/or remove one from the title stats.
+
+        A re-scored review passes both the new and the old score.
+
+        """
+        score_delta = (added_score or 0) - (removed_score or 0)
+        count_delta = (added_score is not None) - (removed_score is not None)
+        score_sum = F('score_sum') + score_delta
+        review_count = F('review_count') + count_delta
+        counters = {}
+        if added_score is not None:
+            field = score_count_field(added_score)
+            counters[field] = F(field) + 1
+        if removed_score is not None:
+            field = score_count_field(removed_score)
+            counters[field] = counters.get(field, F(field)) - 1
+        return self.update(
+            score_sum=score_sum,
+            review_count=review_count,
+            average_score=Case(
+                When(
+                    review_count__gt=-count_delta,
+                    then=ExpressionWrapper(
+                        score_sum * 1.0 / review_count,
+                        output_field=FloatField(),
+                    ),
+                ),
+                default=None,
+                output_field=FloatField(),
+            ),
+            **counters,
+        )
+
+    def rebuild_review_stats(self, batch_size=1000):
+        """Recalculate the review stats of the titles from scratch."""
+        stats = {}
+        for row in Review.objects.filter(title__in=self).values(
+            'title', 'score'
+        ).annotate(total=Count('id')):
+            stats.setdefault(row['title'], {})[row['score']] = row['total']
+        titles = list(self.only('id'))
+        for title in titles:
+            distribution = stats.get(title.id, {})
+            for score in SCORES:
+                setattr(
+                    title, score_count_field(score),
+                    distribution.get(score, 0)
+                )
+            title.score_sum = sum(
+                score * count for score, count in distribution.items()
+            )
+            title.review_count = sum(distribution.values())
+            title.average_score = (
+                title.score_sum / title.review_count
+                if title.review_count else None
+            )
+        fields = ['score_sum', 'review_count', 'average_score']
+        fields.extend(score_count_field(score) for score in SCORES)
+        with transaction.atomic():
+            self.model.objects.bulk_update(
+                titles, fields, batch_size=batch_size
+            )
+            transaction.on_commit(
+                lambda: bump_version(self.model._meta.label_lower)
+            )
+        return len(titles)
+
+
+class ScoreDistributionModel(models.Model):
+    """Abstract model with a review counter for every possible score."""
+    score_1_count = models.PositiveIntegerField(default=0, editable=False)
+    score_2_count = models.PositiveIntegerField(default=0, editable=False)
+    score_3_count = models.PositiveIntegerField(default=0, editable=False)
+    score_4_count = models.PositiveIntegerField(default=0, editable=False)
+    score_5_count = models.PositiveIntegerField(default=0, editable=False)
+    score_6_count = models.PositiveIntegerField(default=0, editable=False)
+    score_7_count = models.PositiveIntegerField(default=0, editable=False)
+    score_8_count = models.PositiveIntegerField(default=0, editable=False)
+    score_9_count = models.PositiveIntegerField(default=0, editable=False)
+    score_10_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        abstract = True
+
+    @property
+    def score_distribution(self):
+        """Number of reviews for every score."""
+        return {
+            score: getattr(self, score_count_field(score)) for score in SCORES
+        }
+
+    def score_at_rank(self, rank):
+        """Score of the review at the given 1-based rank, lowest first."""
+        seen = 0
+        for score, count in self.score_distribution.items():
+            seen += count
+            if seen >= rank:
+                return score
+        return None
+
+    def score_percentile(self, percent):
+        """Nearest-rank percentile of the review scores."""
+        total = sum(self.score_distribution.values())
+        if not total:
+            return None
+        return self.score_at_rank(max(1, math.ceil(percent / 100 * total)))
+
+    @property
+    def median_score(self):
+        total = sum(self.score_distribution.values())
+        if not total:
+            return None
+        return (
+            self.score_at_rank((total + 1) // 2)
+            + self.score_at_rank(total // 2 + 1)
+        ) / 2
+
+
+class Title(ScoreDistributionModel):
     """Title db model class."""
     name = models.CharField(
         'Name',
         max_length=256,
     )
+    name_key = models.CharField(
+        'Case-insensitive name',
+        max_length=256,
+        db_index=True,
+        editable=False,
+    )
     year = models.PositiveSmallIntegerField(
         'Release year',
         validators=[validate_not_exceed_current_year]
@@ -83,6 +272,23 @@ class Title(models.Model):
         related_query_name='titles',
         null=True,
     )
+    score_sum = models.PositiveIntegerField(
+        'Sum of review scores',
+        default=0,
+        editable=False,
+    )
+    review_count = models.PositiveIntegerField(
+        'Number of reviews',
+        default=0,
+        editable=False,
+    )
+    average_score = models.FloatField(
+        'Average review score',
+        null=True,
+        editable=False,
+    )
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Title'
@@ -93,16 +299,71 @@ class Title(models.Model):
                 name='name_year_category'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['category', 'year'],
+                name='title_category_year_idx',
+            ),
+            models.Index(
+                fields=['-average_score', '-review_count'],
+                name='title_top_idx',
+            ),
+            models.Index(
+                fields=['category', '-average_score', '-review_count'],
+                name='title_top_category_idx',
+            ),
+            models.Index(
+                fields=['year', '-average_score', '-review_count'],
+                name='title_top_year_idx',
+            ),
+        ]
 
     def __str__(self):
         return f'{self.category} "{self.name}", {self.year}'
 
+    def save(self, *args, **kwargs):
+        self.name_key = self.name.casefold()
+        super().save(*args, **kwargs)
+
     def display_genres(self):
         """Display all genres in a single line on the admin panel."""
         return ', '.join(map(str, self.genre.all()))
 
     display_genres.short_description = 'Genres'
 
+    @property
+    def rating(self):
+        """Average review score rounded to an integer."""
+        if not self.review_count:
+            return None
+        return round(self.score_sum / self.review_count)
+
+
+class ReviewQuerySet(models.QuerySet):
+    """Review queryset with helpers for the persisted comment counters."""
+
+    def update_comment_count(self, delta):
+        return self.update(comment_count=F('comment_count') + delta)
+
+    def rebuild_comment_counts(self, batch_size=1000):
+        """Recalculate the comment counters of the reviews from scratch."""
+        counts = dict(
+            Comment.objects.filter(review__in=self).values(
+                'review'
+            ).annotate(total=Count('id')).values_list('review', 'total')
+        )
+        reviews = list(self.only('id'))
+        for review in reviews:
+            review.comment_count = counts.get(review.id, 0)
+        with transaction.atomic():
+            self.model.objects.bulk_update(
+                reviews, ['comment_count'], batch_size=batch_size
+            )
+            transaction.on_commit(
+                lambda: bump_version(self.model._meta.label_lower)
+            )
+        return len(reviews)
+
 
 class Review(models.Model):
     """Review db model class."""
@@ -130,6 +391,11 @@ class Review(models.Model):
     pub_date = models.DateTimeField(
         auto_now_add=True, db_index=True, verbose_name="Date created"
     )
+    comment_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="Number of comments"
+    )
+
+    objects = ReviewQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Review"
@@ -139,10 +405,32 @@ class Review(models.Model):
                 fields=["author", "title"], name="only_one_review_allowed"
             ),
         ]
+        indexes = [
+            models.Index(
+                fields=["title", "pub_date", "id"],
+                name="review_title_pub_date_idx",
+            ),
+            models.Index(
+                fields=["author", "pub_date", "id"],
+                name="review_author_pub_date_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.text[:settings.STRING_OUTPUT_LENGTH]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the loaded score to update the title stats on save."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_score = instance.__dict__.get("score")
+        return instance
+
+    def save(self, *args, **kwargs):
+        """Save the review and the title stats in one transaction."""
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     """Comment db model class."""
@@ -167,6 +455,53 @@ class Comment(models.Model):
     class Meta:
         verbose_name = "Comment"
         verbose_name_plural = "Comments"
+        indexes = [
+            models.Index(
+                fields=["review", "pub_date", "id"],
+                name="comment_review_pub_date_idx",
+            ),
+            models.Index(
+                fields=["author", "pub_date", "id"],
+                name="comment_author_pub_date_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.text[:settings.STRING_OUTPUT_LENGTH]
+
+
+class LoadedFile(models.Model):
+    """Checksum of a data file loaded by the incremental loader."""
+
+    path = models.CharField("Path", max_length=1024, unique=True)
+    checksum = models.CharField("Checksum", max_length=64)
+    loaded_at = models.DateTimeField("Date loaded", auto_now=True)
+
+    class Meta:
+        verbose_name = "Loaded file"
+        verbose_name_plural = "Loaded files"
+
+    def __str__(self):
+        return self.path
+
+
+class LoadedBatch(models.Model):
+    """Checksum of a batch of rows of a loaded data file."""
+
+    file = models.ForeignKey(
+        LoadedFile,
+        on_delete=models.CASCADE,
+        related_name="batches",
+        verbose_name="File",
+    )
+    number = models.PositiveIntegerField("Number")
+    checksum = models.CharField("Checksum", max_length=64)
+
+    class Meta:
+        verbose_name = "Loaded batch"
+        verbose_name_plural = "Loaded batches"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["file", "number"], name="unique_file_batch"
+            ),
+        ]
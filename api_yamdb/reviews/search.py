@@ -0,0 +1,143 @@
+"""
+Full-text search over titles backed by an SQLite FTS5 index.
+
+The index is a standalone FTS5 table with its own copy of `Title.name`
+and `Title.description`, kept in sync with `reviews_title` by triggers.
+Text is tokenized with `unicode61`, which folds the case of Cyrillic and
+other scripts; `ё` is stored as `е` because the tokenizer keeps them apart.
+
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+SEARCH_TABLE = 'reviews_title_fts'
+TITLE_TABLE = 'reviews_title'
+
+
+def _normalized(column):
+    return f"replace(replace({column}, 'ё', 'е'), 'Ё', 'Е')"
+
+
+SEARCH_INDEX_SQL = (
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+        name, description, tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_insert
+    AFTER INSERT ON {TITLE_TABLE} BEGIN
+        INSERT INTO {SEARCH_TABLE}(rowid, name, description) VALUES (
+            new.id, {_normalized('new.name')},
+            {_normalized('new.description')}
+        );
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_update
+    AFTER UPDATE OF id, name, description ON {TITLE_TABLE} BEGIN
+        DELETE FROM {SEARCH_TABLE} WHERE rowid = old.id;
+        INSERT INTO {SEARCH_TABLE}(rowid, name, description) VALUES (
+            new.id, {_normalized('new.name')},
+            {_normalized('new.description')}
+        );
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_delete
+    AFTER DELETE ON {TITLE_TABLE} BEGIN
+        DELETE FROM {SEARCH_TABLE} WHERE rowid = old.id;
+    END
+    """,
+)
+SEARCH_TRIGGERS = tuple(
+    f'{SEARCH_TABLE}_{event}' for event in ('insert', 'update', 'delete')
+)
+
+
+def is_search_index_supported(using=connection):
+    return using.vendor == 'sqlite'
+
+
+def rebuild_search_index(using=connection):
+    """Fill the search index from scratch and return the number of titles."""
+    with using.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {SEARCH_TABLE}(rowid, name, description) '
+            f'SELECT id, {_normalized("name")}, '
+            f'{_normalized("description")} FROM {TITLE_TABLE}'
+        )
+        return cursor.rowcount
+
+
+def create_search_index(using=connection):
+    """
+    Create the search index and its triggers if they are missing.
+
+    Django rebuilds a table on most SQLite schema changes and the triggers
+    are dropped with the old table, so this runs after every migration and
+    re-indexes the titles whenever a trigger had to be restored.
+
+    """
+    if not is_search_index_supported(using):
+        return
+    with using.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger'"
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        for statement in SEARCH_INDEX_SQL:
+            cursor.execute(statement)
+    if not existing.issuperset(SEARCH_TRIGGERS):
+        rebuild_search_index(using)
+
+
+def drop_search_index(using=connection):
+    if not is_search_index_supported(using):
+        return
+    with using.cursor() as cursor:
+        for trigger in SEARCH_TRIGGERS:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        cursor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+
+def get_search_terms(text):
+    """Split a user query into words, `ё` folded the same way as the index."""
+    text = text.replace('ё', 'е').replace('Ё', 'Е')
+    return re.findall(r'\w+', text)
+
+
+def search_titles(queryset, text):
+    """
+    Narrow a Title queryset down to the titles matching every word of
+    the text by prefix and order them by relevance.
+
+    """
+    terms = get_search_terms(text)
+    if not terms:
+        return queryset.none()
+    if not is_search_index_supported():
+        condition = Q()
+        for term in terms:
+            condition &= (
+                Q(name__icontains=term) | Q(description__icontains=term)
+            )
+        return queryset.filter(condition)
+    match = ' '.join(f'"{term}"*' for term in terms)
+    return queryset.filter(
+        pk__in=RawSQL(
+            f'SELECT rowid FROM {SEARCH_TABLE} '
+            f'WHERE {SEARCH_TABLE} MATCH %s',
+            (match,),
+        )
+    ).annotate(
+        search_rank=RawSQL(
+            f'SELECT rank FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} '
+            f'MATCH %s AND rowid = {TITLE_TABLE}.id',
+            (match,),
+        )
+    ).order_by('search_rank', 'id')
@@ -0,0 +1,76 @@
+from functools import partial
+
+from django.db import connections, transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.search import create_search_index
+from reviews.versions import bump_version
+
+VERSIONED_MODELS = (Category, Genre, Title, Review, Comment, User)
+
+
+@receiver(post_save, sender=Review)
+def add_review_to_title_stats(sender, instance, created, **kwargs):
+    """Keep the title stats in step with a created or re-scored review."""
+    loaded_score = getattr(instance, '_loaded_score', None)
+    score = int(instance.score)
+    instance._loaded_score = score
+    if created:
+        loaded_score = None
+    elif loaded_score is None or loaded_score == score:
+        return
+    Title.objects.filter(pk=instance.title_id).update_review_stats(
+        added_score=score, removed_score=loaded_score
+    )
+
+
+@receiver(post_delete, sender=Review)
+def remove_review_from_title_stats(sender, instance, **kwargs):
+    """Subtract a deleted review, cascades included, from the title stats."""
+    Title.objects.filter(pk=instance.title_id).update_review_stats(
+        removed_score=int(instance.score)
+    )
+
+
+@receiver(post_save, sender=Comment)
+def add_comment_to_review_count(sender, instance, created, **kwargs):
+    """Count a created comment in its review."""
+    if created:
+        Review.objects.filter(pk=instance.review_id).update_comment_count(1)
+
+
+@receiver(post_delete, sender=Comment)
+def remove_comment_from_review_count(sender, instance, **kwargs):
+    """Uncount a deleted comment, cascades included."""
+    Review.objects.filter(pk=instance.review_id).update_comment_count(-1)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def bump_model_version(sender, **kwargs):
+    """Move a versioned model to a new version once the write is committed."""
+    if sender in VERSIONED_MODELS:
+        transaction.on_commit(
+            partial(bump_version, sender._meta.label_lower)
+        )
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def bump_title_version(sender, action, **kwargs):
+    """Genres of a title changed, so the titles get a new version."""
+    if action.startswith('post_'):
+        transaction.on_commit(
+            partial(bump_version, Title._meta.label_lower)
+        )
+
+
+def bump_all_versions(**kwargs):
+    """Tables were migrated or flushed, so no cached state is valid."""
+    bump_version(*(model._meta.label_lower for model in VERSIONED_MODELS))
+
+
+def restore_title_search_index(using, **kwargs):
+    """Recreate search index triggers dropped by table rebuilds."""
+    create_search_index(connections[using])
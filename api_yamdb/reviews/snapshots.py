@@ -0,0 +1,98 @@
+"""
+Process-local snapshots of the small, rarely written group tables.
+
+Every access compares the snapshot with the model version kept in the
+shared cache and reloads the whole table only when the version moved, so
+in the steady state slug lookups and representations cost no query.
+Misses fall back to the database.
+
+"""
+import threading
+
+from reviews.models import Category, Genre
+from reviews.versions import get_version
+
+EMPTY_REPRESENTATION = {'name': '', 'slug': ''}
+
+
+class GroupSnapshot:
+    """Snapshot of a Genre-like table: slug -> id and id -> representation."""
+
+    def __init__(self, model):
+        self.model = model
+        self.label = model._meta.label_lower
+        self.version = None
+        self.by_id = {}
+        self.by_slug = {}
+        self.by_slug_key = {}
+        self.lock = threading.Lock()
+
+    def refresh(self):
+        version = get_version(self.label)
+        if version == self.version:
+            return
+        with self.lock:
+            if version == self.version:
+                return
+            by_id, by_slug, by_slug_key = {}, {}, {}
+            for pk, name, slug, slug_key in self.model.objects.values_list(
+                'id', 'name', 'slug', 'slug_key'
+            ):
+                by_id[pk] = {'name': name, 'slug': slug}
+                by_slug[slug] = pk
+                by_slug_key.setdefault(slug_key, []).append(pk)
+            self.by_id, self.by_slug = by_id, by_slug
+            self.by_slug_key = by_slug_key
+            self.version = version
+
+    def invalidate(self):
+        self.version = None
+
+    def get_id(self, slug):
+        """
+        Id of the row with exactly this slug, or None.
+
+        A miss falls back to the database, the row may have been written
+        in the current transaction before the version counter moved.
+
+        """
+        self.refresh()
+        pk = self.by_slug.get(slug)
+        if pk is None:
+            pk = self.model.objects.filter(slug=slug).values_list(
+                'id', flat=True
+            ).first()
+            if pk is not None:
+                self.invalidate()
+        return pk
+
+    def get_ids_iexact(self, slug):
+        """Ids of the rows with this slug in any letter case, see `get_id`."""
+        self.refresh()
+        slug_key = slug.casefold()
+        ids = self.by_slug_key.get(slug_key)
+        if ids is None:
+            ids = list(self.model.objects.filter(
+                slug_key=slug_key
+            ).values_list('id', flat=True))
+            if ids:
+                self.invalidate()
+        return ids
+
+    def get_representation(self, pk, refresh=True):
+        """Name and slug of the row, empty ones for a missing row."""
+        if refresh:
+            self.refresh()
+        representation = self.by_id.get(pk)
+        if representation is None:
+            representation = pk and self.model.objects.filter(
+                pk=pk
+            ).values('name', 'slug').first()
+            if not representation:
+                return dict(EMPTY_REPRESENTATION)
+            self.invalidate()
+        return dict(representation)
+
+
+genre_snapshot = GroupSnapshot(Genre)
+category_snapshot = GroupSnapshot(Category)
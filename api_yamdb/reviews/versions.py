@@ -0,0 +1,97 @@
+"""
+Per-model versions kept in the `shared` cache.
+
+A version is replaced after every committed write to the model, so anything
+derived from the model's rows can be cached under the current version and
+never has to be invalidated key by key. The cache is shared by all
+processes, so a write in a worker, a shell or a management command is seen
+everywhere.
+
+"""
+import math
+import time
+import uuid
+
+from django.core.cache import caches
+
+cache = caches['shared']
+
+VERSION_KEY = 'version:{}'
+BUMPS_KEY = 'version-bumps:{}'
+MODIFIED_KEY = 'version-modified:{}'
+LAST_MODIFIED_KEY = 'version-modified'
+
+
+def _new_version():
+    """
+    Return a never repeated version.
+
+    Versions are not incremented: increments of the file cache are not
+    atomic, two concurrent bumps could leave the version moved only once.
+
+    """
+    return uuid.uuid4().hex
+
+
+def _new_modified():
+    """
+    Return a timestamp in whole seconds later than any previous one.
+
+    `Last-Modified` has a one second resolution, so two writes within a
+    second must still get different timestamps.
+
+    """
+    previous = cache.get(LAST_MODIFIED_KEY, 0)
+    modified = max(int(previous) + 1, math.ceil(time.time()))
+    cache.set(LAST_MODIFIED_KEY, modified, timeout=None)
+    return modified
+
+
+def get_versions(*labels):
+    """Return the current versions of the given model labels."""
+    keys = {VERSION_KEY.format(label): label for label in labels}
+    versions = cache.get_many(keys)
+    for key in keys.keys() - versions.keys():
+        cache.add(key, _new_version(), timeout=None)
+        versions[key] = cache.get(key)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def get_version(label):
+    """Return the current version of the given model label."""
+    return get_versions(label)[label]
+
+
+def get_last_modified(*labels):
+    """Return the timestamp of the latest bump of the given labels."""
+    keys = [MODIFIED_KEY.format(label) for label in labels]
+    modified = cache.get_many(keys)
+    for key in set(keys) - modified.keys():
+        cache.add(key, _new_modified(), timeout=None)
+        modified[key] = cache.get(key)
+    return max(modified.values(), default=None)
+
+
+def bump_version(*labels):
+    """Move the given model labels to a new version."""
+    modified = _new_modified()
+    for label in labels:
+        cache.set(MODIFIED_KEY.format(label), modified, timeout=None)
+        cache.set(VERSION_KEY.format(label), _new_version(), timeout=None)
+        try:
+            cache.incr(BUMPS_KEY.format(label))
+        except ValueError:
+            cache.add(BUMPS_KEY.format(label), 1, timeout=None)
+
+
+def get_bump_counts(*labels):
+    """
+    Return how many times each of the given labels has been bumped.
+
+    Concurrent bumps may be counted once, the counts are statistics only.
+
+    """
+    counts = cache.get_many([BUMPS_KEY.format(label) for label in labels])
+    return {
+        label: counts.get(BUMPS_KEY.format(label), 0) for label in labels
+    }
@@ -0,0 +1,70 @@
+"""
+Confirmation codes exchanged for access tokens.
+
+A code lives for `CONFIRMATION_CODE_TTL` seconds and survives at most
+`CONFIRMATION_CODE_MAX_ATTEMPTS` wrong guesses; a correct one is used up.
+Issuing and checking codes never writes to the user row.
+
+"""
+from datetime import timedelta
+from string import hexdigits
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, get_random_string
+
+from users.models import ConfirmationCode
+
+
+def issue_code(user, created=False):
+    """
+    Store a new code of the user and return it.
+
+    A concurrent request may create the row first, then its code is
+    overwritten.
+
+    """
+    code = get_random_string(6, hexdigits)
+    expires_at = timezone.now() + timedelta(
+        seconds=settings.CONFIRMATION_CODE_TTL
+    )
+    codes = ConfirmationCode.objects.filter(user=user)
+    fields = {'code': code, 'attempts': 0, 'expires_at': expires_at}
+    if not created and codes.update(**fields):
+        return code
+    try:
+        with transaction.atomic():
+            ConfirmationCode.objects.create(user=user, **fields)
+    except IntegrityError:
+        codes.update(**fields)
+    return code
+
+
+def check_code(user, code):
+    """
+    Check the code, counting the failed attempt or using it up.
+
+    The user should come with `select_related('confirmation')`.
+
+    """
+    confirmation = getattr(user, 'confirmation', None)
+    if confirmation is None or not confirmation.is_usable:
+        return False
+    if not constant_time_compare(confirmation.code, code):
+        ConfirmationCode.objects.filter(pk=confirmation.pk).update(
+            attempts=F('attempts') + 1
+        )
+        return False
+    confirmation.delete()
+    return True
+
+
+def purge_codes():
+    """Delete expired and exhausted codes, return their number."""
+    count, _ = ConfirmationCode.objects.filter(
+        Q(expires_at__lte=timezone.now())
+        | Q(attempts__gte=settings.CONFIRMATION_CODE_MAX_ATTEMPTS)
+    ).delete()
+    return count
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from users.codes import purge_codes
+
+
+class Command(BaseCommand):
+    help = 'Deletes expired and exhausted confirmation codes.'
+
+    def handle(self, *args, **options):
+        count = purge_codes()
+        self.stdout.write(f'{count} confirmation codes are deleted.')
@@ -0,0 +1,50 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from users.outbox import deliver_pending
+
+
+class Command(BaseCommand):
+    help = (
+        'Delivers the pending e-mails of the outbox in batches, retrying '
+        'failed ones with backoff.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=settings.EMAIL_OUTBOX_BATCH_SIZE,
+            help='Number of e-mails sent over one backend connection.'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=settings.EMAIL_OUTBOX_WORKERS,
+            help='Number of batches sent in parallel.'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep polling the outbox instead of exiting when it is empty.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Seconds between polls in --loop mode.'
+        )
+
+    def deliver(self, options):
+        result = deliver_pending(
+            batch_size=options['batch_size'], workers=options['workers']
+        )
+        if result.sent or result.retried or result.failed:
+            self.stdout.write(
+                f'Sent {result.sent}, to retry {result.retried}, '
+                f'failed {result.failed}.'
+            )
+        for email_id, error in result.errors.items():
+            self.stderr.write(f'E-mail {email_id}: {error}')
+
+    def handle(self, *args, **options):
+        self.deliver(options)
+        while options['loop']:
+            time.sleep(options['interval'])
+            self.deliver(options)
@@ -0,0 +1,39 @@
+# Generated by Django 3.2 on 2026-10-18 06:39
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutgoingEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=255, verbose_name='Subject')),
+                ('body', models.TextField(verbose_name='Body')),
+                ('from_email', models.EmailField(max_length=254, verbose_name='From')),
+                ('to_email', models.EmailField(max_length=254, verbose_name='To')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=12, verbose_name='Status')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Attempts')),
+                ('last_error', models.TextField(blank=True, verbose_name='Last error')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Created')),
+                ('send_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Send after')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Sent')),
+            ],
+            options={
+                'verbose_name': 'Outgoing email',
+                'verbose_name_plural': 'Outgoing emails',
+                'ordering': ('send_after', 'id'),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='outgoingemail',
+            index=models.Index(fields=['status', 'send_after'], name='outgoing_email_due_idx'),
+        ),
+    ]
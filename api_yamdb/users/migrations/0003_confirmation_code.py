@@ -0,0 +1,51 @@
+# Generated by Django 3.2 on 2026-10-18 06:41
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils import timezone
+
+
+def move_codes(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    ConfirmationCode = apps.get_model('users', 'ConfirmationCode')
+    expires_at = timezone.now() + timedelta(
+        seconds=settings.CONFIRMATION_CODE_TTL
+    )
+    ConfirmationCode.objects.bulk_create(
+        ConfirmationCode(user_id=user_id, code=code, expires_at=expires_at)
+        for user_id, code in User.objects.exclude(
+            confirmation_code=''
+        ).values_list('id', 'confirmation_code').iterator()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_outgoing_email'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConfirmationCode',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(max_length=50, verbose_name='Code')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Failed attempts')),
+                ('expires_at', models.DateTimeField(db_index=True, verbose_name='Expires')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='confirmation', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Confirmation code',
+                'verbose_name_plural': 'Confirmation codes',
+            },
+        ),
+        migrations.RunPython(move_codes, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='user',
+            name='confirmation_code',
+        ),
+    ]
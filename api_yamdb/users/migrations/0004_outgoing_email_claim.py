@@ -0,0 +1,23 @@
+# Generated by Django 3.2 on 2026-10-18 07:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_confirmation_code'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outgoingemail',
+            name='claim',
+            field=models.CharField(blank=True, max_length=32, verbose_name='Claimed by'),
+        ),
+        migrations.AlterField(
+            model_name='outgoingemail',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=12, verbose_name='Status'),
+        ),
+    ]
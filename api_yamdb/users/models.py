@@ -1,7 +1,10 @@
+import hashlib
+
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import RegexValidator
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from users.validators import validate_username
@@ -50,11 +53,6 @@ class User(AbstractUser):
         choices=UserRoles.choices,
         max_length=12,
     )
-    confirmation_code = models.CharField(
-        verbose_name='Confirmation code',
-        blank=True,
-        max_length=50,
-    )
 
     class Meta:
         verbose_name = 'User'
@@ -78,5 +76,94 @@ class User(AbstractUser):
     def is_user(self):
         return self.role == UserRoles.USER
 
+    @property
+    def auth_stamp(self):
+        """Digest of everything an access token vouches for."""
+        return hashlib.md5(
+            f'{self.username}:{self.role}:{self.is_superuser}:'
+            f'{self.is_active}'.encode()
+        ).hexdigest()
+
     def __str__(self):
         return self.username
+
+
+class ConfirmationCode(models.Model):
+    """Short-lived code a user exchanges for an access token."""
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='confirmation',
+        verbose_name='User',
+    )
+    code = models.CharField(verbose_name='Code', max_length=50)
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name='Failed attempts', default=0
+    )
+    expires_at = models.DateTimeField(verbose_name='Expires', db_index=True)
+
+    class Meta:
+        verbose_name = 'Confirmation code'
+        verbose_name_plural = 'Confirmation codes'
+
+    @property
+    def is_usable(self):
+        return (
+            self.expires_at > timezone.now()
+            and self.attempts < settings.CONFIRMATION_CODE_MAX_ATTEMPTS
+        )
+
+    def __str__(self):
+        return f'Code of {self.user}'
+
+
+class OutgoingEmail(models.Model):
+    """E-mail waiting in the outbox for the `send_emails` worker."""
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', _('Pending')
+        SENDING = 'sending', _('Sending')
+        SENT = 'sent', _('Sent')
+        FAILED = 'failed', _('Failed')
+
+    subject = models.CharField(verbose_name='Subject', max_length=255)
+    body = models.TextField(verbose_name='Body')
+    from_email = models.EmailField(
+        verbose_name='From', max_length=settings.LIMIT_EMAIL
+    )
+    to_email = models.EmailField(
+        verbose_name='To', max_length=settings.LIMIT_EMAIL
+    )
+    status = models.CharField(
+        verbose_name='Status',
+        default=Status.PENDING,
+        choices=Status.choices,
+        max_length=12,
+    )
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name='Attempts', default=0
+    )
+    last_error = models.TextField(verbose_name='Last error', blank=True)
+    claim = models.CharField(
+        verbose_name='Claimed by', max_length=32, blank=True
+    )
+    created = models.DateTimeField(verbose_name='Created', auto_now_add=True)
+    send_after = models.DateTimeField(
+        verbose_name='Send after', default=timezone.now
+    )
+    sent_at = models.DateTimeField(verbose_name='Sent', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Outgoing email'
+        verbose_name_plural = 'Outgoing emails'
+        ordering = ('send_after', 'id')
+        indexes = [
+            models.Index(
+                fields=('status', 'send_after'),
+                name='outgoing_email_due_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.subject} -> {self.to_email}'
@@ -0,0 +1,168 @@
+"""
+Outbox of e-mails delivered outside of the request.
+
+Views only queue messages with `queue_email`; the `send_emails` command
+hands due messages to a thread pool in batches, each batch sent over one
+backend connection. Failed messages are retried with exponential backoff
+until `EMAIL_OUTBOX_MAX_ATTEMPTS` is reached.
+
+A batch is claimed with a conditional update before it is sent, so
+overlapping runs do not send the same message. A claim is a lease:
+messages of a run that died or hung while sending are due again after
+`EMAIL_OUTBOX_LEASE` seconds and may then be sent twice. Results are
+written only while the claim is still held.
+
+"""
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from users.models import OutgoingEmail
+
+
+def queue_email(subject, message, from_email, to_email):
+    return OutgoingEmail.objects.create(
+        subject=subject, body=message, from_email=from_email,
+        to_email=to_email,
+    )
+
+
+@dataclass
+class DeliveryResult:
+    """Outcome of one delivery pass."""
+
+    sent: int = 0
+    retried: int = 0
+    failed: int = 0
+    errors: dict = field(default_factory=dict)
+
+
+def get_backoff(attempts):
+    """Seconds to wait before the next attempt."""
+    return settings.EMAIL_OUTBOX_BACKOFF * 2 ** (attempts - 1)
+
+
+def send_batch(emails):
+    """Send the emails over one connection, return errors by email id."""
+    errors = {}
+    try:
+        connection = get_connection()
+        connection.open()
+    except Exception as error:
+        return {email.pk: repr(error) for email in emails}
+    try:
+        for email in emails:
+            message = EmailMessage(
+                email.subject, email.body, email.from_email,
+                [email.to_email], connection=connection,
+            )
+            try:
+                message.send()
+            except Exception as error:
+                errors[email.pk] = repr(error)
+    finally:
+        connection.close()
+    return errors
+
+
+def record_results(emails, errors, result):
+    """Store the outcome of the emails whose claim is still held."""
+    now = timezone.now()
+    groups = defaultdict(list)
+    for email in emails:
+        attempts = email.attempts + 1
+        if email.pk not in errors:
+            values = {
+                'status': OutgoingEmail.Status.SENT, 'attempts': attempts,
+                'last_error': '', 'sent_at': now,
+            }
+            result.sent += 1
+        elif attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+            values = {
+                'status': OutgoingEmail.Status.FAILED, 'attempts': attempts,
+                'last_error': errors[email.pk],
+            }
+            result.failed += 1
+        else:
+            values = {
+                'status': OutgoingEmail.Status.PENDING, 'attempts': attempts,
+                'last_error': errors[email.pk],
+                'send_after': now + timedelta(seconds=get_backoff(attempts)),
+            }
+            result.retried += 1
+        groups[email.claim, tuple(values.items())].append(email.pk)
+    result.errors.update(errors)
+    for (claim, values), ids in groups.items():
+        OutgoingEmail.objects.filter(pk__in=ids, claim=claim).update(
+            **dict(values)
+        )
+
+
+def get_due_ids(after_id, limit):
+    """Ids of the due emails, pending or with an expired claim."""
+    return list(
+        OutgoingEmail.objects.filter(
+            status__in=(
+                OutgoingEmail.Status.PENDING, OutgoingEmail.Status.SENDING
+            ),
+            send_after__lte=timezone.now(),
+            id__gt=after_id,
+        ).order_by('id').values_list('id', flat=True)[:limit]
+    )
+
+
+def claim_emails(ids):
+    """Claim the still due emails among ids, return the ones won."""
+    claim = uuid.uuid4().hex
+    now = timezone.now()
+    OutgoingEmail.objects.filter(
+        pk__in=ids,
+        status__in=(
+            OutgoingEmail.Status.PENDING, OutgoingEmail.Status.SENDING
+        ),
+        send_after__lte=now,
+    ).update(
+        status=OutgoingEmail.Status.SENDING,
+        claim=claim,
+        send_after=now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE),
+    )
+    return list(
+        OutgoingEmail.objects.filter(pk__in=ids, claim=claim).order_by('id')
+    )
+
+
+def deliver_pending(batch_size=None, workers=None):
+    """
+    Deliver the due pending emails.
+
+    Database access stays in the calling thread, the pool only talks to
+    the mail backend. Only claimed messages are sent and failed ones are
+    rescheduled.
+
+    """
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    workers = workers or settings.EMAIL_OUTBOX_WORKERS
+    result = DeliveryResult()
+    last_id = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while True:
+            ids = get_due_ids(last_id, batch_size * workers)
+            if not ids:
+                break
+            last_id = ids[-1]
+            emails = claim_emails(ids)
+            batches = [
+                emails[start:start + batch_size]
+                for start in range(0, len(emails), batch_size)
+            ]
+            for batch, errors in zip(
+                batches, executor.map(send_batch, batches)
+            ):
+                record_results(batch, errors, result)
+    return result
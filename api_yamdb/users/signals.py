@@ -0,0 +1,16 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from users.models import User
+from users.stamps import delete_auth_stamp, set_auth_stamp
+
+
+@receiver(post_save, sender=User)
+def refresh_auth_stamp(sender, instance, **kwargs):
+    """Tokens issued before a role or activity change stop being trusted."""
+    set_auth_stamp(instance)
+
+
+@receiver(post_delete, sender=User)
+def drop_auth_stamp(sender, instance, **kwargs):
+    delete_auth_stamp(instance.pk)
@@ -0,0 +1,41 @@
+"""
+Authentication stamps of the users kept in the shared cache.
+
+A stamp changes whenever anything a token vouches for changes: username,
+role, superuser rights or activity. Tokens carry the stamp of the moment
+they were issued, so a token whose stamp still matches the cached one can
+be trusted without loading the user.
+
+The cache is shared by all processes, so a change saved anywhere applies
+to the next request. Writes that skip the model signals, such as
+`QuerySet.update`, are picked up once the stamp expires after
+`AUTH_STAMP_TIMEOUT` seconds.
+
+"""
+from django.conf import settings
+from django.core.cache import caches
+
+cache = caches['shared']
+
+STAMP_KEY = 'auth-stamp:{}'
+DELETED_STAMP = ''
+
+
+def get_auth_stamp(user_id):
+    """Return the cached stamp of the user, None if it is not cached."""
+    return cache.get(STAMP_KEY.format(user_id))
+
+
+def set_auth_stamp(user):
+    cache.set(
+        STAMP_KEY.format(user.pk), user.auth_stamp,
+        timeout=settings.AUTH_STAMP_TIMEOUT,
+    )
+
+
+def delete_auth_stamp(user_id):
+    """Mark the user as gone so that its tokens are checked in the db."""
+    cache.set(
+        STAMP_KEY.format(user_id), DELETED_STAMP,
+        timeout=settings.AUTH_STAMP_TIMEOUT,
+    )
@@ -0,0 +1,82 @@
+import io
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    def get_rating(self, client, title_id):
+        response = client.get(f'/api/v1/titles/{title_id}/')
+        assert response.status_code == HTTPStatus.OK
+        return response.json().get('rating')
+
+    def test_01_rating_follows_review_changes(self, admin_client,
+                                              user_client, moderator_client,
+                                              client, user):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(admin_client, title_id, 'Отлично', 10)
+        review = create_single_review(
+            user_client, title_id, 'Неплохо', 6
+        ).json()
+        create_single_review(moderator_client, title_id, 'Так себе', 2)
+        assert self.get_rating(client, title_id) == 6, (
+            'Проверьте, что поле `rating` произведения пересчитывается при '
+            'создании отзывов.'
+        )
+
+        user_client.patch(
+            f'/api/v1/titles/{title_id}/reviews/{review["id"]}/',
+            data={'score': 9}
+        )
+        assert self.get_rating(client, title_id) == 7, (
+            'Проверьте, что поле `rating` произведения пересчитывается при '
+            'изменении оценки в отзыве.'
+        )
+
+        user.delete()
+        assert self.get_rating(client, title_id) == 6, (
+            'Проверьте, что поле `rating` произведения пересчитывается при '
+            'каскадном удалении отзывов вместе с автором.'
+        )
+
+        response = client.get(f'/api/v1/titles/{titles[1]["id"]}/')
+        assert response.json().get('rating') is None, (
+            'Рейтинг произведения без отзывов должен быть `None`.'
+        )
+
+    def test_02_rebuild_ratings_command(self, admin_client, user_client,
+                                        client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(admin_client, title_id, 'Отлично', 10)
+        create_single_review(user_client, title_id, 'Хорошо', 7)
+        Title.objects.update(score_sum=0, review_count=0)
+
+        call_command('rebuild_ratings')
+        title = Title.objects.get(pk=title_id)
+        assert (title.score_sum, title.review_count) == (17, 2), (
+            'Проверьте, что команда `rebuild_ratings` заново рассчитывает '
+            'состояние рейтинга произведений.'
+        )
+        assert self.get_rating(client, title_id) == 8
+
+    def test_03_default_loader_keeps_ratings(self, client):
+        from reviews.models import Comment, Review
+
+        call_command('load_csvdata', stdout=io.StringIO())
+        assert (Review.objects.count(), Comment.objects.count()) == (72, 3), (
+            'Проверьте, что команда `load_csvdata` загружает отзывы и '
+            'комментарии из csv-файлов.'
+        )
+        assert self.get_rating(client, 1) == 10, (
+            'Проверьте, что рейтинг произведений рассчитывается при загрузке '
+            'данных командой `load_csvdata`.'
+        )
@@ -0,0 +1,147 @@
+import pytest
+from rest_framework.pagination import PageNumberPagination
+
+from tests.utils import create_categories, create_genre
+
+TITLE_LIST_QUERIES = 3
+
+
+def warm_up_snapshots():
+    from reviews.snapshots import category_snapshot, genre_snapshot
+
+    genre_snapshot.refresh()
+    category_snapshot.refresh()
+
+
+def create_many_titles(genres, categories, count):
+    from reviews.models import Category, Genre, Title
+
+    genres = list(Genre.objects.filter(
+        slug__in=[g['slug'] for g in genres]
+    ).order_by('id'))
+    categories = list(Category.objects.filter(
+        slug__in=[c['slug'] for c in categories]
+    ).order_by('id'))
+    Title.objects.bulk_create(
+        Title(
+            name=f'Произведение {idx}',
+            year=1950 + idx % 50,
+            category=categories[idx % len(categories)],
+        )
+        for idx in range(count)
+    )
+    titles = Title.objects.order_by('id')
+    Title.genre.through.objects.bulk_create(
+        Title.genre.through(title_id=title.id, genre_id=genre.id)
+        for idx, title in enumerate(titles)
+        for genre in genres[:idx % len(genres) + 1]
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09TitleQueries:
+
+    @pytest.mark.parametrize('page_size', (5, 50, 500))
+    @pytest.mark.parametrize('params', (
+        '',
+        '?category=films',
+        '?genre=comedy',
+        '?year=1951',
+        '?name=Произведение 1',
+        '?category=FILMS&genre=horror',
+        '?category=books&year=1951&genre=comedy',
+    ))
+    def test_01_title_list_query_count(self, admin_client, client,
+                                       django_assert_num_queries,
+                                       monkeypatch, page_size, params):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        create_many_titles(genres, categories, page_size)
+        monkeypatch.setattr(PageNumberPagination, 'page_size', page_size)
+        warm_up_snapshots()
+
+        with django_assert_num_queries(TITLE_LIST_QUERIES):
+            response = client.get(f'/api/v1/titles/{params}')
+        if not params:
+            assert len(response.json()['results']) == page_size, (
+                'Проверьте, что для эндпоинта `/api/v1/titles/` настроена '
+                'пагинация.'
+            )
+
+    def test_02_title_detail_query_count(self, admin_client, client,
+                                         django_assert_num_queries):
+        from reviews.models import Title
+
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        create_many_titles(genres, categories, 5)
+        title = Title.objects.first()
+        warm_up_snapshots()
+
+        with django_assert_num_queries(2):
+            response = client.get(f'/api/v1/titles/{title.id}/')
+        assert len(response.json()['genre']) == title.genre.count()
+
+    def test_03_title_write_skips_group_tables(self, admin_client, client):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        create_genre(admin_client)
+        create_categories(admin_client)
+        warm_up_snapshots()
+        data = {
+            'name': 'Чужой',
+            'year': 1979,
+            'genre': ['horror', 'drama'],
+            'category': 'films',
+        }
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post('/api/v1/titles/', data=data)
+            client.get('/api/v1/titles/?genre=HORROR&category=films')
+        genres = sorted(
+            response.json()['genre'], key=lambda genre: genre['slug']
+        )
+        assert genres == [
+            {'name': 'Драма', 'slug': 'drama'},
+            {'name': 'Ужасы', 'slug': 'horror'},
+        ]
+        group_queries = [
+            query['sql'] for query in context.captured_queries
+            if 'reviews_genre"' in query['sql']
+            or 'reviews_category"' in query['sql']
+        ]
+        assert not group_queries, (
+            'Проверьте, что при записи и фильтрации произведений жанры и '
+            'категории берутся из снимка таблиц, а не из базы данных.'
+        )
+
+    def test_04_rows_missing_from_snapshot(self, admin_client, client):
+        from django.db import connection
+
+        from reviews.models import Genre, Title
+
+        create_genre(admin_client)
+        create_categories(admin_client)
+        warm_up_snapshots()
+        # Written by another process, the snapshot has not seen it yet.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'INSERT INTO reviews_genre (name, slug, slug_key) '
+                "VALUES ('Нуар', 'Noir', 'noir')"
+            )
+        title = Title.objects.create(name='Мальтийский сокол', year=1941)
+        Title.genre.through.objects.create(
+            title=title, genre=Genre.objects.get(slug='Noir')
+        )
+
+        response = client.get('/api/v1/titles/?genre=noir')
+        assert [item['id'] for item in response.json()['results']] == [
+            title.id
+        ], (
+            'Проверьте, что фильтр по жанру находит жанры, которых ещё нет '
+            'в снимке таблицы.'
+        )
+        response = client.get(f'/api/v1/titles/{title.id}/')
+        assert response.json()['genre'] == [
+            {'name': 'Нуар', 'slug': 'Noir'}
+        ]
@@ -0,0 +1,86 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_comments, create_titles
+
+
+def collect_cursor_pages(client, url):
+    results = []
+    pages = 0
+    while url:
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert 'count' not in data, (
+            'В режиме курсорной пагинации ответ не должен содержать ключ '
+            '`count`.'
+        )
+        results.extend(data['results'])
+        url = data['next']
+        pages += 1
+    return results, pages
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10CursorPagination:
+
+    def test_01_titles_cursor_mode(self, admin_client, client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {idx}', year=2000) for idx in range(10)
+        )
+        results, pages = collect_cursor_pages(
+            client, '/api/v1/titles/?pagination=cursor'
+        )
+        ids = [title['id'] for title in results]
+        assert ids == sorted(Title.objects.values_list('id', flat=True)), (
+            'Проверьте, что в режиме курсорной пагинации `/api/v1/titles/` '
+            'возвращает все произведения по порядку и без повторов.'
+        )
+        assert pages == 3
+
+        response = client.get('/api/v1/titles/')
+        assert response.json()['count'] == len(ids), (
+            'Пагинация по номеру страницы должна остаться режимом по '
+            'умолчанию.'
+        )
+
+    def test_02_reviews_and_comments_cursor_mode(self, admin_client, client,
+                                                 user_client,
+                                                 moderator_client, admin,
+                                                 user, moderator):
+        authors_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client,
+        }
+        comments, reviews, titles = create_comments(admin_client, authors_map)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        results, _ = collect_cursor_pages(client, f'{url}?pagination=cursor')
+        assert [review['id'] for review in results] == [
+            review['id'] for review in reviews
+        ], (
+            f'Проверьте, что в режиме курсорной пагинации `{url}` возвращает '
+            'отзывы в порядке публикации.'
+        )
+
+        url = f'{url}{reviews[0]["id"]}/comments/'
+        results, _ = collect_cursor_pages(client, f'{url}?pagination=cursor')
+        assert [comment['id'] for comment in results] == [
+            comment['id'] for comment in comments
+        ], (
+            f'Проверьте, что в режиме курсорной пагинации `{url}` возвращает '
+            'комментарии в порядке публикации.'
+        )
+
+    def test_03_users_cursor_mode(self, admin_client, user, moderator):
+        results, pages = collect_cursor_pages(
+            admin_client, '/api/v1/users/?pagination=cursor'
+        )
+        assert {item['username'] for item in results} == {
+            'TestAdmin', user.username, moderator.username
+        }
+        assert pages == 1
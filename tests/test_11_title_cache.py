@@ -0,0 +1,115 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import (create_single_review, create_titles,
+                         run_in_other_process)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11TitleResponseCache:
+
+    def test_01_repeated_title_requests_are_cached(
+            self, admin_client, client, django_assert_num_queries):
+        from api.cache import get_response_cache_stats
+
+        titles, _, _ = create_titles(admin_client)
+        stats_before = get_response_cache_stats()
+        url = '/api/v1/titles/?category=films&year=1984'
+        first = client.get(url).json()
+        with django_assert_num_queries(0):
+            second = client.get('/api/v1/titles/?year=1984&category=films')
+        assert second.json() == first, (
+            'Повторный запрос с теми же параметрами фильтрации должен '
+            'возвращать закэшированный ответ.'
+        )
+        client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        with django_assert_num_queries(0):
+            client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+
+        stats = get_response_cache_stats()
+        assert stats['hits'] - stats_before['hits'] == 2
+        assert stats['misses'] - stats_before['misses'] == 2
+
+    def test_02_writes_invalidate_cached_titles(self, admin_client,
+                                                user_client, client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        assert client.get(url).json()['rating'] is None
+
+        create_single_review(user_client, titles[0]['id'], 'Отлично', 9)
+        assert client.get(url).json()['rating'] == 9, (
+            'Проверьте, что создание отзыва сбрасывает кэш произведений.'
+        )
+
+        admin_client.patch(url, data={'genre': ['drama']})
+        genres = [genre['slug'] for genre in client.get(url).json()['genre']]
+        assert genres == ['drama'], (
+            'Проверьте, что изменение жанров произведения сбрасывает кэш '
+            'произведений.'
+        )
+
+        admin_client.delete('/api/v1/categories/films/')
+        assert client.get(url).json()['category'] != {
+            'name': 'Фильм', 'slug': 'films'
+        }, 'Проверьте, что удаление категории сбрасывает кэш произведений.'
+
+    def test_03_response_cache_stats_command(self):
+        out = StringIO()
+        call_command('response_cache_stats', stdout=out)
+        for line in ('Hits', 'Misses', 'Invalidations'):
+            assert line in out.getvalue()
+
+    def test_04_writes_of_other_processes_invalidate(self, admin_client,
+                                                     client):
+        from api.cache import flush_response_cache_stats
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        client.get(url)
+        client.get(url)
+        # Another process writes the row and bumps the version there.
+        Title.objects.filter(pk=titles[0]['id']).update(name='Новое имя')
+        run_in_other_process(
+            'from reviews.versions import bump_version\n'
+            'bump_version("reviews.title")'
+        )
+        assert client.get(url).json()['name'] == 'Новое имя', (
+            'Проверьте, что запись в другом процессе сбрасывает кэш '
+            'произведений.'
+        )
+
+        flush_response_cache_stats()
+        out = run_in_other_process(
+            'from django.core.management import call_command\n'
+            'call_command("response_cache_stats")'
+        )
+        hits = int(out.split('Hits: ')[1].split()[0])
+        assert hits >= 1, (
+            'Проверьте, что команда `response_cache_stats` показывает '
+            'статистику всех процессов.'
+        )
+
+    def test_05_stats_are_written_in_batches(self, admin_client, client,
+                                             settings):
+        from api.cache import (STATS_KEY, flush_response_cache_stats,
+                               stats_cache)
+
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        flush_response_cache_stats()
+        settings.RESPONSE_CACHE_STATS_BATCH = 5
+        settings.RESPONSE_CACHE_STATS_INTERVAL = 60 * 60
+        hits = stats_cache.get(STATS_KEY.format('hits'), 0)
+        for _ in range(4):
+            client.get(url)
+        assert stats_cache.get(STATS_KEY.format('hits'), 0) == hits, (
+            'Проверьте, что статистика кэша не записывается в общий кэш '
+            'при каждом запросе.'
+        )
+        client.get(url)
+        assert stats_cache.get(STATS_KEY.format('hits'), 0) == hits + 4, (
+            'Проверьте, что статистика кэша записывается пачками.'
+        )
@@ -0,0 +1,118 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import (create_reviews, create_single_comment,
+                         create_single_review, create_titles,
+                         run_in_other_process)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12ConditionalGet:
+
+    def test_01_not_modified_reviews(self, admin_client, user_client,
+                                     moderator_client, client, user,
+                                     moderator, django_assert_num_queries):
+        authors_map = {user: user_client}
+        reviews, titles = create_reviews(admin_client, authors_map)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+
+        response = client.get(url)
+        etag = response.get('ETag')
+        assert etag and response.get('Last-Modified'), (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'заголовки `ETag` и `Last-Modified`.'
+        )
+        with django_assert_num_queries(0):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Если `ETag` ответа `{url}` не изменился, GET-запрос с '
+            'заголовком `If-None-Match` должен вернуть ответ со статусом 304.'
+        )
+        assert response.get('ETag') == etag
+
+        response = client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+        create_single_review(moderator_client, titles[0]['id'], 'Ещё', 3)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после добавления отзыва `ETag` списка отзывов '
+            'меняется.'
+        )
+        assert response.get('ETag') != etag
+
+    def test_02_not_modified_comment_detail(self, admin_client, user_client,
+                                            client, user):
+        reviews, titles = create_reviews(admin_client, {user: user_client})
+        comment = create_single_comment(
+            user_client, titles[0]['id'], reviews[0]['id'], 'Комментарий'
+        ).json()
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+            f'comments/{comment["id"]}/'
+        )
+        etag = client.get(url)['ETag']
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == (
+            HTTPStatus.NOT_MODIFIED
+        )
+
+        user_client.patch(url, data={'text': 'Исправленный комментарий'})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['text'] == 'Исправленный комментарий'
+
+    def test_03_validators_on_other_endpoints(self, admin_client):
+        for url in ('/api/v1/titles/', '/api/v1/genres/',
+                    '/api/v1/categories/', '/api/v1/users/',
+                    '/api/v1/users/TestAdmin/'):
+            response = admin_client.get(url)
+            assert response.get('ETag'), (
+                f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+                'заголовок `ETag`.'
+            )
+            response = admin_client.get(
+                url, HTTP_IF_NONE_MATCH=response['ETag']
+            )
+            assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    def test_04_writes_of_other_processes_change_etag(self, admin_client,
+                                                      client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        etag = client.get(url)['ETag']
+        Title.objects.filter(pk=titles[0]['id']).update(name='Новое имя')
+        run_in_other_process(
+            'from reviews.versions import bump_version\n'
+            'bump_version("reviews.title")'
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после записи в другом процессе прежний `ETag` '
+            'больше не подходит.'
+        )
+        assert response.json()['name'] == 'Новое имя'
+
+    def test_05_writes_within_a_second_change_last_modified(
+        self, admin_client, user_client, client, user
+    ):
+        reviews, titles = create_reviews(admin_client, {user: user_client})
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        last_modified = client.get(url)['Last-Modified']
+        for text in ('Первый', 'Второй'):
+            create_single_comment(
+                user_client, titles[0]['id'], reviews[0]['id'], text
+            )
+            response = client.get(
+                url, HTTP_IF_MODIFIED_SINCE=last_modified
+            )
+            assert response.status_code == HTTPStatus.OK, (
+                'Проверьте, что `Last-Modified` меняется после каждой '
+                'записи, даже если записи сделаны в одну секунду.'
+            )
+            assert response['Last-Modified'] != last_modified
+            last_modified = response['Last-Modified']
@@ -0,0 +1,70 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13TitleSearch:
+    url = '/api/v1/titles/search/'
+
+    def search(self, client, params):
+        response = client.get(self.url, data=params)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_search_titles(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        admin_client.post('/api/v1/titles/', data={
+            'name': 'Ёлки',
+            'year': 2010,
+            'genre': ['comedy'],
+            'category': 'films',
+            'description': 'Новогодняя комедия про терминатора',
+        })
+
+        assert self.search(client, {'q': 'ТЕРМИНАТ'}) == [
+            'Терминатор', 'Ёлки'
+        ], (
+            'Проверьте, что поиск не зависит от регистра, находит слова по '
+            'началу и ранжирует совпадения в названии выше.'
+        )
+        assert self.search(client, {'q': 'елки'}) == ['Ёлки']
+        assert self.search(client, {'q': 'yippie орешек'}) == [
+            'Крепкий орешек'
+        ]
+        assert self.search(
+            client, {'q': 'терминатор', 'year': 2010, 'genre': 'comedy'}
+        ) == ['Ёлки'], (
+            'Проверьте, что поиск можно совмещать с фильтрами произведений.'
+        )
+
+        response = client.get(self.url)
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+        response = client.get(
+            self.url, data={'q': 'терминатор', 'pagination': 'cursor'}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что курсорная пагинация, теряющая ранжирование, '
+            'недоступна для поиска.'
+        )
+
+    def test_02_search_index_follows_writes(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/', data={'name': 'Хищник'}
+        )
+        assert self.search(client, {'q': 'терминатор'}) == []
+        assert self.search(client, {'q': 'хищник'}) == ['Хищник']
+
+        admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert self.search(client, {'q': 'хищник'}) == []
+
+        call_command('rebuild_search_index')
+        assert self.search(client, {'q': 'орешек'}) == ['Крепкий орешек']
@@ -0,0 +1,68 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14TitleLeaderboard:
+    url = '/api/v1/titles/top/'
+
+    def get_top(self, client, params=None):
+        response = client.get(self.url, data=params or {})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        return [title['name'] for title in response.json()]
+
+    def test_01_top_titles(self, admin_client, client, admin, user,
+                           moderator, settings):
+        from reviews.models import Review, Title
+
+        settings.LEADERBOARD_MIN_REVIEWS = 2
+        titles, _, _ = create_titles(admin_client)
+        admin_client.post('/api/v1/titles/', data={
+            'name': 'Чужой',
+            'year': 1979,
+            'genre': ['horror'],
+            'category': 'films',
+        })
+        terminator, die_hard, alien = (
+            Title.objects.get(pk=titles[0]['id']),
+            Title.objects.get(pk=titles[1]['id']),
+            Title.objects.get(name='Чужой'),
+        )
+        scores = {
+            terminator: (8, 9, 7),
+            die_hard: (9, 10),
+            alien: (10,),
+        }
+        for title, title_scores in scores.items():
+            for author, score in zip((admin, user, moderator), title_scores):
+                Review.objects.create(
+                    author=author, title=title, text='Отзыв', score=score
+                )
+
+        assert self.get_top(client) == ['Крепкий орешек', 'Терминатор'], (
+            f'Проверьте, что `{self.url}` возвращает произведения по '
+            'убыванию рейтинга и пропускает произведения с малым числом '
+            'отзывов.'
+        )
+        assert self.get_top(client, {'genre': 'horror'}) == ['Терминатор']
+        assert self.get_top(client, {'category': 'books'}) == [
+            'Крепкий орешек'
+        ]
+        assert self.get_top(client, {'year': 1984}) == ['Терминатор']
+        assert self.get_top(client, {'limit': 1}) == ['Крепкий орешек']
+
+        Review.objects.filter(title=die_hard, author=user).delete()
+        assert self.get_top(client) == ['Терминатор'], (
+            'Проверьте, что рейтинг лидеров обновляется при удалении отзывов.'
+        )
+        die_hard.refresh_from_db()
+        assert die_hard.average_score == 9
+
+        response = client.get(self.url, data={'limit': 'много'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,55 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15TitleScoreStats:
+
+    def test_01_score_distribution(self, admin_client, client, admin, user,
+                                   moderator, user_superuser,
+                                   django_assert_max_num_queries):
+        from reviews.models import Review, Title
+
+        titles, _, _ = create_titles(admin_client)
+        title = Title.objects.get(pk=titles[0]['id'])
+        authors = (admin, user, moderator, user_superuser)
+        for author, score in zip(authors, (2, 7, 7, 10)):
+            Review.objects.create(
+                author=author, title=title, text='Отзыв', score=score
+            )
+        review = Review.objects.get(author=user_superuser)
+        review.score = 9
+        review.save()
+        Review.objects.filter(author=admin).delete()
+
+        expected = {str(score): 0 for score in range(1, 11)}
+        expected.update({'7': 2, '9': 1})
+        response = client.get(f'/api/v1/titles/{title.id}/')
+        assert response.json().get('score_distribution') == expected, (
+            'Проверьте, что ответ на GET-запрос к `/api/v1/titles/{id}/` '
+            'содержит распределение оценок `score_distribution`.'
+        )
+
+        url = f'/api/v1/titles/{title.id}/stats/'
+        with django_assert_max_num_queries(2):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        stats = response.json()
+        assert stats['score_distribution'] == expected
+        assert stats['review_count'] == 3
+        assert stats['rating'] == 8
+        assert stats['median'] == 7
+        assert stats['percentiles'] == {'25': 7, '75': 9, '90': 9}
+
+    def test_02_empty_stats(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        stats = client.get(f'/api/v1/titles/{titles[1]["id"]}/stats/').json()
+        assert stats['median'] is None
+        assert stats['percentiles'] == {'25': None, '75': None, '90': None}
+        assert set(stats['score_distribution'].values()) == {0}
@@ -0,0 +1,56 @@
+import pytest
+
+from tests.utils import create_titles
+
+
+def get_plan(params):
+    from django.http import QueryDict
+
+    from api.filters import TitleFilter
+    from reviews.models import Title
+
+    filterset = TitleFilter(
+        QueryDict(params), queryset=Title.objects.all()
+    )
+    return filterset.qs.explain()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16LookupIndexes:
+
+    def test_01_title_filter_uses_indexes(self, admin_client):
+        create_titles(admin_client)
+
+        plan = get_plan('name=ТЕРМИНАТОР')
+        assert 'USING INDEX reviews_title_name_key' in plan, (
+            'Проверьте, что фильтр по названию использует индекс по '
+            f'`name_key`. План запроса: {plan}'
+        )
+        plan = get_plan('category=FILMS&year=1984')
+        assert 'USING INDEX title_category_year_idx' in plan, (
+            'Проверьте, что фильтр по категории и году использует составной '
+            f'индекс. План запроса: {plan}'
+        )
+        plan = get_plan('genre=Horror')
+        assert 'reviews_title_genre_genre_id' in plan, (
+            'Проверьте, что фильтр по жанру использует индекс таблицы связей. '
+            f'План запроса: {plan}'
+        )
+
+    def test_02_case_insensitive_filters(self, admin_client, client):
+        create_titles(admin_client)
+        for params in ('name=ТЕРМИНАТОР', 'category=FILMS&year=1984',
+                       'genre=Horror'):
+            response = client.get(f'/api/v1/titles/?{params}')
+            names = [title['name'] for title in response.json()['results']]
+            assert names == ['Терминатор'], (
+                f'Проверьте, что фильтрация произведений по `{params}` не '
+                'зависит от регистра.'
+            )
+
+    def test_03_group_slug_key_lookup_uses_index(self, admin_client):
+        from reviews.models import Genre
+
+        create_titles(admin_client)
+        plan = Genre.objects.filter(slug_key='horror').explain()
+        assert 'USING INDEX reviews_genre_slug_key' in plan, plan
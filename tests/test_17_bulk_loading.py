@@ -0,0 +1,264 @@
+import csv
+import gzip
+import io
+import json
+import shutil
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17BulkLoading:
+
+    def test_01_bulk_load(self, client, tmp_path):
+        from reviews.models import Comment, Genre, Review, Title
+
+        call_command('load_csvdata', '--bulk', '--rejects-dir', tmp_path)
+        assert (
+            Title.objects.count(), Title.genre.through.objects.count(),
+            Review.objects.count(), Comment.objects.count()
+        ) == (32, 42, 72, 3), (
+            'Проверьте, что команда `load_csvdata --bulk` загружает все '
+            'строки файлов с данными.'
+        )
+        assert not list(tmp_path.iterdir()), (
+            'Проверьте, что при загрузке корректных данных файлы с '
+            'отклонёнными строками не создаются.'
+        )
+        assert Genre.objects.get(slug='drama').name == 'Драма'
+
+        response = client.get('/api/v1/titles/1/')
+        assert response.json()['rating'] == 10, (
+            'Проверьте, что после пакетной загрузки рейтинги произведений '
+            'пересчитываются.'
+        )
+        response = client.get('/api/v1/titles/?genre=drama')
+        assert response.json()['count'] == 9
+
+    def test_02_bulk_load_rejects(self, tmp_path):
+        from reviews.models import Genre
+
+        call_command('load_csvdata', '--bulk', '--rejects-dir', tmp_path)
+        Genre.objects.filter(slug='drama').delete()
+        call_command('load_csvdata', '--bulk', '--rejects-dir', tmp_path)
+
+        assert Genre.objects.filter(slug='drama').exists(), (
+            'Проверьте, что при ошибке в пакете корректные строки '
+            'всё равно загружаются.'
+        )
+        with open(tmp_path / 'genre.rejects.csv', encoding='utf-8') as file:
+            rejects = list(csv.DictReader(file))
+        assert len(rejects) == 14
+        assert all('UNIQUE' in row['error'] for row in rejects), (
+            'Проверьте, что в файл отклонённых строк записывается причина '
+            'ошибки.'
+        )
+
+    def test_03_dependency_order(self):
+        from django.apps import apps
+
+        from reviews.loading import dependency_order
+        from reviews.models import Category, Comment, Genre, Review, Title
+        from users.models import User
+
+        genre_title = apps.get_model('reviews', 'Title_genre')
+        ordered = dependency_order(
+            [Comment, genre_title, Review, Title, Genre, Category, User]
+        )
+        for model, parent in ((Title, Genre), (Title, Category),
+                              (genre_title, Title), (Review, Title),
+                              (Review, User), (Comment, Review)):
+            assert ordered.index(parent) < ordered.index(model), (
+                'Проверьте, что файлы загружаются после файлов моделей, '
+                'на которые они ссылаются.'
+            )
+
+    def test_04_parallel_bulk_load(self, client, tmp_path):
+        from reviews.models import Comment, Review, Title
+
+        call_command(
+            'load_csvdata', '--bulk', '--workers', '2',
+            '--rejects-dir', tmp_path,
+        )
+        assert (
+            Title.objects.count(), Title.genre.through.objects.count(),
+            Review.objects.count(), Comment.objects.count()
+        ) == (32, 42, 72, 3), (
+            'Проверьте, что команда `load_csvdata --bulk --workers 2` '
+            'загружает все строки файлов с данными.'
+        )
+        response = client.get('/api/v1/titles/1/')
+        assert response.json()['rating'] == 10
+
+    def test_05_incremental_load(self, client, tmp_path):
+        from django.conf import settings
+
+        from reviews.models import Review, Title, User
+
+        data_path = tmp_path / 'data'
+        shutil.copytree(settings.CSV_DATA_PATH, data_path)
+        options = ('--incremental', '--batch-size', '10',
+                   '--manifest', data_path / 'manifest.json',
+                   '--rejects-dir', tmp_path / 'rejects')
+        call_command('load_csvdata', *options)
+        assert Review.objects.count() == 72
+        first_review = Review.objects.get(pk=1)
+        assert first_review.pub_date.isoformat().startswith(
+            '2019-09-24T21:08:21'
+        ), 'Проверьте, что при вставке сохраняются даты из файла.'
+        user = User.objects.get(username='bingobongo')
+        user.set_password('secret-password')
+        user.save()
+
+        with open(data_path / 'users.csv', encoding='utf-8') as file:
+            users = file.read()
+        with open(data_path / 'users.csv', 'w', encoding='utf-8') as file:
+            file.write(users.replace(',user,,', ',user,Новое био,', 1))
+
+        with open(data_path / 'review.csv', encoding='utf-8',
+                  newline='') as file:
+            reader = csv.DictReader(file)
+            fieldnames, rows = reader.fieldnames, list(reader)
+        rows[0]['score'] = '2'
+        with open(data_path / 'review.csv', 'w', encoding='utf-8',
+                  newline='') as file:
+            writer = csv.DictWriter(file, fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
+        untouched_id = int(rows[-1]['title_id'])
+        assert untouched_id not in {int(row['title_id']) for row in rows[:10]}
+        Title.objects.filter(pk=untouched_id).update(score_sum=0)
+
+        out = io.StringIO()
+        call_command('load_csvdata', *options, stdout=out)
+        output = out.getvalue()
+        assert 'Title: file is unchanged, skipped' in output, (
+            'Проверьте, что инкрементальная загрузка пропускает '
+            'неизменившиеся файлы.'
+        )
+        assert 'Review: 10 rows loaded' in output, (
+            'Проверьте, что инкрементальная загрузка пропускает '
+            'неизменившиеся пакеты строк.'
+        )
+        assert Review.objects.count() == 72
+        assert Review.objects.get(pk=1).pub_date == first_review.pub_date, (
+            'Проверьте, что повторная загрузка не меняет даты отзывов.'
+        )
+        user.refresh_from_db()
+        assert user.bio == 'Новое био'
+        assert user.check_password('secret-password'), (
+            'Проверьте, что пустой пароль в файле не затирает пароль '
+            'существующего пользователя.'
+        )
+        assert Review.objects.get(pk=rows[0]['id']).score == 2, (
+            'Проверьте, что изменённые строки обновляются по первичному '
+            'ключу.'
+        )
+        title_id = int(rows[0]['title_id'])
+        title = Title.objects.get(pk=title_id)
+        assert title.score_sum == sum(
+            int(row['score']) for row in rows
+            if int(row['title_id']) == title_id
+        ), (
+            'Проверьте, что рейтинг произведений с изменёнными отзывами '
+            'пересчитывается.'
+        )
+        assert Title.objects.get(pk=untouched_id).score_sum == 0, (
+            'Проверьте, что инкрементальная загрузка пересчитывает только '
+            'затронутые произведения.'
+        )
+
+    def test_06_compressed_and_jsonl_files(self, client, tmp_path):
+        from django.conf import settings
+
+        from reviews.models import Comment, Review, Title
+
+        with open(settings.DATA_MANIFEST, encoding='utf-8') as file:
+            manifest = json.load(file)
+        for index, entry in enumerate(manifest['files']):
+            source = settings.CSV_DATA_PATH / entry['path']
+            if index % 2:
+                entry['path'] += '.gz'
+                with open(source, 'rb') as src, gzip.open(
+                    tmp_path / entry['path'], 'wb'
+                ) as dst:
+                    shutil.copyfileobj(src, dst)
+                continue
+            entry['path'] = entry['path'].replace('.csv', '.jsonl.gz')
+            with open(source, encoding='utf-8', newline='') as src, gzip.open(
+                tmp_path / entry['path'], 'wt', encoding='utf-8'
+            ) as dst:
+                for row in csv.DictReader(src):
+                    dst.write(json.dumps(row, ensure_ascii=False) + '\n')
+        with open(tmp_path / 'manifest.json', 'w', encoding='utf-8') as file:
+            json.dump(manifest, file)
+
+        call_command(
+            'load_csvdata', '--bulk', '--batch-size', '7',
+            '--manifest', tmp_path / 'manifest.json',
+            '--rejects-dir', tmp_path / 'rejects',
+        )
+        assert (
+            Title.objects.count(), Title.genre.through.objects.count(),
+            Review.objects.count(), Comment.objects.count()
+        ) == (32, 42, 72, 3), (
+            'Проверьте, что команда `load_csvdata` загружает сжатые файлы '
+            'csv и jsonl по манифесту.'
+        )
+        response = client.get('/api/v1/titles/1/')
+        assert response.json()['rating'] == 10
+
+    def test_07_row_by_row_load(self, client):
+        from reviews.models import Comment, Review, Title
+
+        call_command('load_csvdata', stdout=io.StringIO())
+        assert (
+            Title.objects.count(), Review.objects.count(),
+            Comment.objects.count()
+        ) == (32, 72, 3), (
+            'Проверьте, что команда `load_csvdata` без `--bulk` загружает '
+            'все строки файлов с данными.'
+        )
+        response = client.get('/api/v1/titles/1/')
+        assert response.json()['rating'] == 10
+
+    def test_08_incremental_load_rejects(self, tmp_path):
+        from django.conf import settings
+
+        from reviews.models import Title
+
+        data_path = tmp_path / 'data'
+        shutil.copytree(settings.CSV_DATA_PATH, data_path)
+        options = ('--incremental',
+                   '--manifest', data_path / 'manifest.json',
+                   '--rejects-dir', tmp_path / 'rejects')
+        call_command('load_csvdata', *options)
+
+        with open(data_path / 'titles.csv', encoding='utf-8',
+                  newline='') as file:
+            reader = csv.DictReader(file)
+            fieldnames, rows = reader.fieldnames, list(reader)
+        rows[1].update(
+            {key: rows[0][key] for key in ('name', 'year', 'category_id')}
+        )
+        rows[2]['year'] = '2000'
+        with open(data_path / 'titles.csv', 'w', encoding='utf-8',
+                  newline='') as file:
+            writer = csv.DictWriter(file, fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
+
+        call_command('load_csvdata', *options)
+        assert Title.objects.get(pk=rows[2]['id']).year == 2000, (
+            'Проверьте, что при ошибке обновления корректные строки '
+            'всё равно обновляются.'
+        )
+        assert Title.objects.get(pk=rows[1]['id']).name != rows[0]['name']
+        with open(tmp_path / 'rejects' / 'titles.rejects.csv',
+                  encoding='utf-8') as file:
+            rejects = list(csv.DictReader(file))
+        assert [row['id'] for row in rejects] == [rows[1]['id']], (
+            'Проверьте, что строки, нарушающие ограничения при обновлении, '
+            'записываются в файл отклонённых строк.'
+        )
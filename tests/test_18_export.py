@@ -0,0 +1,107 @@
+import csv
+import io
+import json
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_comments, create_titles
+
+
+def read_stream(response):
+    return b''.join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18Export:
+
+    def test_01_export_titles_csv(self, admin_client):
+        titles, _, genres = create_titles(admin_client)
+        response = admin_client.get('/api/v1/export/titles/')
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Type'].startswith('text/csv')
+        rows = list(csv.DictReader(io.StringIO(read_stream(response))))
+        assert [row['name'] for row in rows] == [
+            title['name'] for title in titles
+        ], (
+            'Проверьте, что `/api/v1/export/titles/` выгружает все '
+            'произведения.'
+        )
+        assert rows[0]['category'] == titles[0]['category']
+        assert rows[0]['genre'] == ','.join(sorted(titles[0]['genre']))
+
+    def test_02_export_comments_ndjson(self, admin_client, user_client,
+                                       moderator_client, admin, user,
+                                       moderator):
+        authors_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client,
+        }
+        comments, reviews, titles = create_comments(admin_client,
+                                                    authors_map)
+        response = admin_client.get(
+            '/api/v1/export/comments/?output=ndjson'
+        )
+        assert response.status_code == HTTPStatus.OK
+        rows = [json.loads(line) for line in read_stream(response).split(
+            '\n'
+        ) if line]
+        assert [(row['id'], row['author'], row['review_id'],
+                 row['title_id']) for row in rows] == [
+            (comment['id'], comment['author'], reviews[0]['id'],
+             titles[0]['id']) for comment in comments
+        ], (
+            'Проверьте, что `/api/v1/export/comments/?output=ndjson` '
+            'выгружает комментарии построчно в формате JSON.'
+        )
+
+    def test_03_export_permissions(self, admin_client, user_client,
+                                   client):
+        assert client.get(
+            '/api/v1/export/titles/'
+        ).status_code == HTTPStatus.UNAUTHORIZED
+        assert user_client.get(
+            '/api/v1/export/titles/'
+        ).status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что выгрузка данных доступна только администратору.'
+        )
+        assert admin_client.get(
+            '/api/v1/export/users/'
+        ).status_code == HTTPStatus.NOT_FOUND
+        assert admin_client.get(
+            '/api/v1/export/titles/?output=xml'
+        ).status_code == HTTPStatus.BAD_REQUEST
+
+    def test_04_export_query_count(self, admin_client, user_client, admin,
+                                   user, django_assert_num_queries):
+        from reviews.export import stream_export
+
+        create_comments(admin_client, {admin: admin_client,
+                                       user: user_client})
+        with django_assert_num_queries(1):
+            lines = list(stream_export('comments', 'csv', chunk_size=1))
+        assert len(lines) == 3
+        with django_assert_num_queries(3):
+            lines = list(stream_export('titles', 'csv', chunk_size=1))
+        assert len(lines) == 3, (
+            'Проверьте, что при выгрузке связанные объекты загружаются '
+            'объединением таблиц, а жанры - одним запросом на пакет строк.'
+        )
+
+    def test_05_dump_data_command(self, admin_client, tmp_path):
+        titles, _, _ = create_titles(admin_client)
+        call_command('dump_data', 'titles', '--format', 'ndjson',
+                     '--output', tmp_path / 'titles.ndjson',
+                     stderr=io.StringIO())
+        with open(tmp_path / 'titles.ndjson', encoding='utf-8') as file:
+            rows = [json.loads(line) for line in file]
+        assert [row['id'] for row in rows] == [
+            title['id'] for title in titles
+        ], (
+            'Проверьте, что команда `dump_data` выгружает данные в файл.'
+        )
+        out = io.StringIO()
+        call_command('dump_data', 'titles', stdout=out)
+        assert len(out.getvalue().splitlines()) == len(titles) + 1
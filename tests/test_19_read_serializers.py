@@ -0,0 +1,55 @@
+import io
+
+import pytest
+from django.core.management import call_command
+from rest_framework.renderers import JSONRenderer
+
+from tests.utils import create_comments
+
+
+def render(data):
+    return JSONRenderer().render(data)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19ReadSerializers:
+
+    def test_01_read_output_is_identical(self, admin_client, user_client,
+                                         admin, user):
+        from api.serializers import (
+            CommentReadSerializer, CommentSerializer, ReviewReadSerializer,
+            ReviewSerializer, TitleDetailReadSerializer,
+            TitleDetailSerializer, TitleReadSerializer, TitleSerializer,
+        )
+        from reviews.models import Category, Comment, Review, Title
+
+        create_comments(admin_client, {admin: admin_client,
+                                       user: user_client})
+        Category.objects.filter(
+            pk=Title.objects.order_by('id').last().category_id
+        ).delete()
+
+        pairs = (
+            (TitleSerializer, TitleReadSerializer, Title),
+            (TitleDetailSerializer, TitleDetailReadSerializer, Title),
+            (ReviewSerializer, ReviewReadSerializer, Review),
+            (CommentSerializer, CommentReadSerializer, Comment),
+        )
+        for serializer_class, read_class, model in pairs:
+            queryset = model.objects.order_by('id')
+            assert render(
+                serializer_class(queryset, many=True).data
+            ) == render(read_class(queryset, many=True).data), (
+                f'Проверьте, что `{read_class.__name__}` выдаёт те же байты, '
+                f'что и `{serializer_class.__name__}`.'
+            )
+            for obj in queryset:
+                assert render(serializer_class(obj).data) == render(
+                    read_class(obj).data
+                )
+
+    def test_02_benchmark_command(self):
+        out = io.StringIO()
+        call_command('benchmark_serializers', '--rows', '10', '--repeat',
+                     '1', stdout=out)
+        assert len(out.getvalue().splitlines()) == 4
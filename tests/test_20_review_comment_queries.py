@@ -0,0 +1,114 @@
+from http import HTTPStatus
+
+import pytest
+from rest_framework.pagination import PageNumberPagination
+
+LIST_QUERIES = 2
+
+
+def create_discussion(count):
+    from reviews.models import Comment, Review, Title
+    from users.models import User
+
+    title = Title.objects.create(name='Терминатор', year=1984)
+    User.objects.bulk_create(
+        User(username=f'user{idx}', email=f'user{idx}@yamdb.fake')
+        for idx in range(count)
+    )
+    users = list(User.objects.filter(username__startswith='user'))
+    for idx, user in enumerate(users):
+        Review.objects.create(
+            title=title, author=user, text=f'Отзыв {idx}', score=5
+        )
+    review = Review.objects.filter(title=title).order_by('id').first()
+    Comment.objects.bulk_create(
+        Comment(review=review, author=user, text='Комментарий')
+        for user in users
+    )
+    return title, review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20ReviewCommentQueries:
+
+    @pytest.mark.parametrize('count', (1, 5, 25))
+    def test_01_list_query_count(self, client, django_assert_num_queries,
+                                 monkeypatch, count):
+        monkeypatch.setattr(PageNumberPagination, 'page_size', count)
+        title, review = create_discussion(count)
+        reviews_url = f'/api/v1/titles/{title.id}/reviews/'
+        comments_url = f'{reviews_url}{review.id}/comments/'
+
+        for url in (reviews_url, comments_url):
+            with django_assert_num_queries(LIST_QUERIES):
+                response = client.get(url)
+            results = response.json()['results']
+            assert len(results) == count
+            assert results[0]['author'].startswith('user'), (
+                f'Проверьте, что `{url}` загружает авторов одним запросом '
+                'со списком.'
+            )
+            with django_assert_num_queries(1):
+                client.get(f'{url}?pagination=cursor')
+
+    def test_02_empty_and_missing_parents(self, client,
+                                          django_assert_num_queries):
+        from reviews.models import Title
+
+        title, review = create_discussion(1)
+        other = Title.objects.create(name='Чужой', year=1979)
+
+        with django_assert_num_queries(LIST_QUERIES):
+            response = client.get(f'/api/v1/titles/{other.id}/reviews/')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['results'] == []
+        response = client.get(f'/api/v1/titles/{other.id + 1}/reviews/')
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что список отзывов несуществующего произведения '
+            'возвращает ответ со статусом 404.'
+        )
+        response = client.get(
+            f'/api/v1/titles/{title.id}/reviews/{review.id + 1}/comments/'
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_03_comment_parents_must_match(self, user_client):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from reviews.models import Comment, Title
+
+        title, review = create_discussion(1)
+        other = Title.objects.create(name='Чужой', year=1979)
+        url = f'/api/v1/titles/{other.id}/reviews/{review.id}/comments/'
+
+        response = user_client.post(url, data={'text': 'Комментарий'})
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что комментарий к отзыву другого произведения '
+            'не создаётся и возвращается ответ со статусом 404.'
+        )
+        assert user_client.get(url).status_code == HTTPStatus.NOT_FOUND
+        comment = Comment.objects.first()
+        assert user_client.get(
+            f'{url}{comment.id}/'
+        ).status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что комментарий не доступен по адресу с чужим '
+            'произведением.'
+        )
+
+        url = f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+        count = Comment.objects.count()
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data={'text': 'Комментарий'})
+        assert response.status_code == HTTPStatus.CREATED
+        assert Comment.objects.count() == count + 1
+        parent_queries = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and ('FROM "reviews_review"' in query['sql']
+                 or 'FROM "reviews_title"' in query['sql'])
+        ]
+        assert len(parent_queries) == 1, (
+            'Проверьте, что отзыв и произведение из адреса проверяются '
+            f'одним запросом. Запросы: {parent_queries}'
+        )
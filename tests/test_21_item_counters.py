@@ -0,0 +1,63 @@
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21ItemCounters:
+
+    def get_counts(self, client, title_id, review_id):
+        title = client.get(f'/api/v1/titles/{title_id}/').json()
+        listed = client.get('/api/v1/titles/').json()['results']
+        assert [t['review_count'] for t in listed if t['id'] == title_id] == [
+            title['review_count']
+        ]
+        review = client.get(
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/'
+        ).json()
+        return title['review_count'], review['comment_count']
+
+    def test_01_counters_follow_writes(self, admin_client, user_client,
+                                       moderator_client, client, admin,
+                                       user, moderator):
+        authors_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client,
+        }
+        comments, reviews, titles = create_comments(admin_client,
+                                                    authors_map)
+        title_id, review_id = titles[0]['id'], reviews[0]['id']
+        assert self.get_counts(client, title_id, review_id) == (3, 3), (
+            'Проверьте, что в ответе есть поля `review_count` произведения '
+            'и `comment_count` отзыва.'
+        )
+
+        admin_client.delete(
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+            f'{comments[0]["id"]}/'
+        )
+        assert self.get_counts(client, title_id, review_id) == (3, 2)
+
+        user.delete()
+        assert self.get_counts(client, title_id, review_id) == (2, 1), (
+            'Проверьте, что счётчики отзывов и комментариев учитывают '
+            'каскадное удаление вместе с автором.'
+        )
+
+    def test_02_rebuild_counters(self, admin_client, user_client, client,
+                                 admin, user):
+        from reviews.models import Review
+
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        Review.objects.update(comment_count=0)
+        call_command('rebuild_ratings')
+        assert self.get_counts(
+            client, titles[0]['id'], reviews[0]['id']
+        ) == (2, 2), (
+            'Проверьте, что команда `rebuild_ratings` пересчитывает '
+            'счётчики комментариев.'
+        )
@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta, timezone
+from http import HTTPStatus
+
+import pytest
+
+PAGE_QUERIES = 4
+
+
+def create_activity(author, other):
+    from reviews.models import Comment, Review, Title
+
+    start = datetime(2023, 1, 1, tzinfo=timezone.utc)
+    expected = []
+    for idx in range(6):
+        title = Title.objects.create(name=f'Произведение {idx}', year=2000)
+        review = Review.objects.create(
+            title=title, author=author, text=f'Отзыв {idx}', score=5
+        )
+        other_review = Review.objects.create(
+            title=title, author=other, text='Чужой отзыв', score=5
+        )
+        # Every second comment shares its date with a review.
+        comment = Comment.objects.create(
+            review=other_review, author=author, text=f'Комментарий {idx}'
+        )
+        Comment.objects.create(
+            review=review, author=other, text='Чужой комментарий'
+        )
+        review_date = start + timedelta(hours=idx)
+        comment_date = review_date + timedelta(minutes=30 * (idx % 2))
+        Review.objects.filter(pk=review.pk).update(pub_date=review_date)
+        Comment.objects.filter(pk=comment.pk).update(pub_date=comment_date)
+        expected.append((review_date, 0, 'review', review.id))
+        expected.append((comment_date, 1, 'comment', comment.id))
+    expected.sort(reverse=True)
+    return [(kind, pk) for _, _, kind, pk in expected]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22UserActivity:
+
+    def test_01_activity_feed(self, moderator_client, user, admin,
+                              django_assert_num_queries):
+        expected = create_activity(user, admin)
+        url = f'/api/v1/users/{user.username}/activity/'
+        feed = []
+        while url:
+            with django_assert_num_queries(PAGE_QUERIES):
+                response = moderator_client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+            assert len(data['results']) <= 5
+            feed.extend((item['type'], item['id'])
+                        for item in data['results'])
+            url = data['next']
+        assert feed == expected, (
+            'Проверьте, что лента активности пользователя объединяет его '
+            'отзывы и комментарии от новых к старым без пропусков и '
+            'повторов.'
+        )
+
+    def test_02_activity_permissions(self, user_client, admin_client,
+                                     client, user):
+        url = f'/api/v1/users/{user.username}/activity/'
+        assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED
+        assert user_client.get(url).status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что лента активности доступна только модераторам '
+            'и администраторам.'
+        )
+        assert admin_client.get(url).status_code == HTTPStatus.OK
+        assert admin_client.get(
+            '/api/v1/users/nobody/activity/'
+        ).status_code == HTTPStatus.NOT_FOUND
+        assert admin_client.get(
+            f'{url}?cursor=broken'
+        ).status_code == HTTPStatus.NOT_FOUND
+
+    def test_03_activity_uses_indexes(self, user):
+        from reviews.models import Comment, Review
+
+        for model, index in ((Review, 'review_author_pub_date_idx'),
+                             (Comment, 'comment_author_pub_date_idx')):
+            plan = model.objects.filter(author=user).order_by(
+                '-pub_date', '-id'
+            )[:6].explain()
+            assert index in plan and 'TEMP B-TREE' not in plan, (
+                'Проверьте, что лента активности читает отзывы и комментарии '
+                f'по индексу автора и даты. План запроса: {plan}'
+            )
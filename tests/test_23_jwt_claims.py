@@ -0,0 +1,118 @@
+from http import HTTPStatus
+
+import pytest
+from rest_framework.test import APIClient
+
+from tests.utils import run_in_other_process
+
+
+def claims_client(user):
+    from api.authentication import get_access_token
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {get_access_token(user)}')
+    return client
+
+
+def user_queries(context):
+    return [
+        query['sql'] for query in context.captured_queries
+        if 'FROM "users_user"' in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23JwtClaims:
+
+    def test_01_reads_skip_user_queries(self, admin, moderator):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from reviews.models import Review, Title
+
+        title = Title.objects.create(name='Терминатор', year=1984)
+        Review.objects.create(title=title, author=admin, text='Отзыв',
+                              score=5)
+        client = claims_client(moderator)
+        with CaptureQueriesContext(connection) as context:
+            for url in ('/api/v1/titles/',
+                        f'/api/v1/titles/{title.id}/reviews/'):
+                assert client.get(url).status_code == HTTPStatus.OK
+        assert not user_queries(context), (
+            'Проверьте, что при чтении пользователь строится из токена без '
+            f'запросов к таблице пользователей: {user_queries(context)}'
+        )
+
+        url = f'/api/v1/users/{admin.username}/activity/'
+        assert client.get(url).status_code == HTTPStatus.OK
+
+        response = client.get('/api/v1/users/me/')
+        assert response.json()['email'] == moderator.email
+        response = client.post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            data={'text': 'Отзыв модератора', 'score': 7}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json()['author'] == moderator.username
+
+    def test_02_role_changes_apply_to_old_tokens(self, admin_client, user):
+        client = claims_client(user)
+        url = f'/api/v1/users/{user.username}/activity/'
+        assert client.get(url).status_code == HTTPStatus.FORBIDDEN
+
+        admin_client.patch(f'/api/v1/users/{user.username}/',
+                           data={'role': 'moderator'})
+        assert client.get(url).status_code == HTTPStatus.OK, (
+            'Проверьте, что смена роли пользователя сразу действует для '
+            'ранее выданных токенов.'
+        )
+
+        user.refresh_from_db()
+        user.is_active = False
+        user.save()
+        assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что токены деактивированного пользователя перестают '
+            'действовать.'
+        )
+
+    def test_03_deleted_user_token_is_rejected(self, user):
+        client = claims_client(user)
+        assert client.get('/api/v1/titles/').status_code == HTTPStatus.OK
+        user.delete()
+        response = client.get('/api/v1/titles/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что токены удалённого пользователя перестают '
+            'действовать.'
+        )
+
+    def test_04_changes_in_other_process(self, admin):
+        from users.models import User
+
+        client = claims_client(admin)
+        assert client.get('/api/v1/users/').status_code == HTTPStatus.OK
+        # Another process demotes the admin and refreshes the stamp there.
+        User.objects.filter(pk=admin.pk).update(role='user')
+        run_in_other_process(
+            'from users.models import User\n'
+            'from users.stamps import set_auth_stamp\n'
+            f'set_auth_stamp(User(pk={admin.pk}, '
+            f'username="{admin.username}", role="user"))'
+        )
+        response = client.get('/api/v1/users/')
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что понижение роли в другом процессе сразу действует '
+            'для ранее выданных токенов.'
+        )
+
+    def test_05_token_cache_is_bounded(self):
+        from api.authentication import TokenLRU
+
+        tokens = TokenLRU(2)
+        for raw in ('a', 'b', 'c'):
+            tokens.set(raw, {'exp': float('inf')})
+        assert tokens.get('a') is None
+        assert tokens.get('c') == {'exp': float('inf')}
+        tokens.set('d', {'exp': 0})
+        assert tokens.get('d') is None, (
+            'Проверьте, что просроченные токены не берутся из кеша.'
+        )
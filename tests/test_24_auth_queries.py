@@ -0,0 +1,108 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24AuthQueries:
+    url_signup = '/api/v1/auth/signup/'
+    url_token = '/api/v1/auth/token/'
+
+    def post(self, client, url, data):
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(url, data=data)
+        queries = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith(('SELECT', 'INSERT', 'UPDATE', 'DELETE'))
+        ]
+        return response, queries
+
+    def test_01_signup_queries(self, client, django_user_model):
+        from users.models import OutgoingEmail
+
+        data = {'username': 'new_user', 'email': 'new_user@yamdb.fake'}
+        response, queries = self.post(client, self.url_signup, data)
+        assert response.status_code == HTTPStatus.OK
+        assert len(queries) == 4, (
+            'Проверьте, что регистрация нового пользователя выполняет один '
+            'запрос на поиск конфликтов и вставки пользователя, кода и '
+            f'письма: {queries}'
+        )
+
+        response, queries = self.post(client, self.url_signup, data)
+        assert response.status_code == HTTPStatus.OK
+        assert len(queries) == 3, queries
+        assert queries[1].startswith(
+            'UPDATE "users_confirmationcode"'
+        ), (
+            'Проверьте, что при повторной регистрации обновляется только '
+            'код подтверждения, а не строка пользователя.'
+        )
+        assert OutgoingEmail.objects.count() == 2
+
+        for data, message in (
+            ({'username': 'new_user', 'email': 'other@yamdb.fake'},
+             'Username is incorrect!'),
+            ({'username': 'other_user', 'email': 'new_user@yamdb.fake'},
+             'Email is incorrect!'),
+        ):
+            response, queries = self.post(client, self.url_signup, data)
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+            assert response.json() == message
+            assert len(queries) == 1
+        assert django_user_model.objects.count() == 1
+
+    def test_02_token_issued_with_one_lookup(self, client, django_user_model):
+        data = {'username': 'new_user', 'email': 'new_user@yamdb.fake'}
+        client.post(self.url_signup, data=data)
+        user = django_user_model.objects.select_related(
+            'confirmation'
+        ).get(username=data['username'])
+
+        response, queries = self.post(client, self.url_token, {
+            'username': user.username,
+            'confirmation_code': user.confirmation.code,
+        })
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что POST-запрос с корректным `confirmation_code` к '
+            f'`{self.url_token}` возвращает токен.'
+        )
+        assert response.json().startswith('token: ')
+        assert len(queries) == 2, queries
+
+        response = client.post(self.url_token, data={
+            'username': user.username, 'confirmation_code': ''
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что пустой `confirmation_code` отклоняется.'
+        )
+
+    def test_03_username_conflict_reported_first(self, client,
+                                                 django_user_model):
+        from api.views import get_signup_conflict
+
+        django_user_model.objects.create(
+            username='new_user', email='username_owner@yamdb.fake'
+        )
+        django_user_model.objects.create(
+            username='email_owner', email='new_user@yamdb.fake'
+        )
+        response = client.post(self.url_signup, data={
+            'username': 'new_user', 'email': 'new_user@yamdb.fake'
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json() == 'Username is incorrect!', (
+            'Проверьте, что при конфликте и по `username`, и по `email` '
+            'с разными пользователями сообщается о занятом `username`.'
+        )
+
+        users = list(django_user_model.objects.order_by('id'))
+        for ordered in (users, users[::-1]):
+            assert get_signup_conflict(
+                ordered, 'new_user', 'new_user@yamdb.fake'
+            ) == 'Username is incorrect!', (
+                'Проверьте, что сообщение о конфликте не зависит от порядка '
+                'строк в выборке.'
+            )
@@ -0,0 +1,156 @@
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+
+class BouncingBackend(EmailBackend):
+    """Locmem backend that refuses addresses of the bounce.fake domain."""
+
+    opened = 0
+
+    def open(self):
+        BouncingBackend.opened += 1
+        return super().open()
+
+    def send_messages(self, messages):
+        for message in messages:
+            if message.to[0].endswith('@bounce.fake'):
+                raise ConnectionError('Mailbox unavailable')
+        return super().send_messages(messages)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25EmailOutbox:
+
+    def test_01_signup_queues_email(self, client):
+        from users.models import OutgoingEmail
+
+        data = {'username': 'new_user', 'email': 'new_user@yamdb.fake'}
+        response = client.post('/api/v1/auth/signup/', data=data)
+        assert response.status_code == HTTPStatus.OK
+        assert not mail.outbox, (
+            'Проверьте, что письмо с кодом подтверждения не отправляется во '
+            'время запроса, а ставится в очередь.'
+        )
+        email = OutgoingEmail.objects.get()
+        assert email.to_email == data['email']
+        assert email.status == OutgoingEmail.Status.PENDING
+
+        call_command('send_emails')
+        call_command('send_emails')
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что команда `send_emails` отправляет письма из '
+            'очереди ровно один раз.'
+        )
+        assert mail.outbox[0].to == [data['email']]
+        email.refresh_from_db()
+        assert email.status == OutgoingEmail.Status.SENT
+        assert email.sent_at is not None
+
+    def test_02_batches_and_retries(self, settings):
+        from users.models import OutgoingEmail
+        from users.outbox import deliver_pending, queue_email
+
+        settings.EMAIL_BACKEND = 'tests.test_25_email_outbox.BouncingBackend'
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+        BouncingBackend.opened = 0
+        for idx in range(4):
+            queue_email('Subject', 'Body', 'admin@yamdb.fake',
+                        f'user_{idx}@yamdb.fake')
+        bounced = queue_email('Subject', 'Body', 'admin@yamdb.fake',
+                              'user@bounce.fake')
+
+        result = deliver_pending(batch_size=2, workers=2)
+        assert (result.sent, result.retried, result.failed) == (4, 1, 0)
+        assert BouncingBackend.opened == 3, (
+            'Проверьте, что письма отправляются пачками, по одному '
+            'соединению с почтовым сервером на пачку.'
+        )
+        assert len(mail.outbox) == 4
+
+        bounced.refresh_from_db()
+        assert bounced.status == OutgoingEmail.Status.PENDING
+        assert bounced.attempts == 1
+        assert 'Mailbox unavailable' in bounced.last_error
+        assert bounced.send_after > timezone.now(), (
+            'Проверьте, что повторная отправка откладывается.'
+        )
+        assert deliver_pending().retried == 0
+
+        OutgoingEmail.objects.filter(pk=bounced.pk).update(
+            send_after=timezone.now()
+        )
+        result = deliver_pending()
+        assert result.failed == 1
+        bounced.refresh_from_db()
+        assert bounced.status == OutgoingEmail.Status.FAILED, (
+            'Проверьте, что после исчерпания попыток письмо помечается как '
+            'неотправленное.'
+        )
+
+    def test_03_overlapping_runs_send_once(self):
+        from users.models import OutgoingEmail
+        from users.outbox import (
+            claim_emails, deliver_pending, get_due_ids, queue_email,
+        )
+
+        for idx in range(3):
+            queue_email('Subject', 'Body', 'admin@yamdb.fake',
+                        f'user_{idx}@yamdb.fake')
+        ids = get_due_ids(0, 10)
+        assert deliver_pending().sent == 3
+        assert claim_emails(ids) == [], (
+            'Проверьте, что письма, отправленные другим запуском, не '
+            'захватываются повторно.'
+        )
+        assert deliver_pending().sent == 0
+        assert len(mail.outbox) == 3, (
+            'Проверьте, что при пересекающихся запусках каждое письмо '
+            'отправляется один раз.'
+        )
+
+        email = queue_email('Subject', 'Body', 'admin@yamdb.fake',
+                            'user@yamdb.fake')
+        assert claim_emails([email.pk]) == [email]
+        assert claim_emails([email.pk]) == []
+        assert deliver_pending().sent == 0, (
+            'Проверьте, что захваченные письма не отправляются другим '
+            'запуском.'
+        )
+        OutgoingEmail.objects.filter(pk=email.pk).update(
+            send_after=timezone.now()
+        )
+        assert deliver_pending().sent == 1, (
+            'Проверьте, что письма с истёкшим захватом отправляются снова.'
+        )
+        assert len(mail.outbox) == 4
+
+    def test_04_expired_claim_keeps_results(self, settings):
+        from users.models import OutgoingEmail
+        from users.outbox import (
+            DeliveryResult, claim_emails, deliver_pending, queue_email,
+            record_results,
+        )
+
+        assert settings.EMAIL_TIMEOUT < settings.EMAIL_OUTBOX_LEASE, (
+            'Проверьте, что таймаут почтового сервера меньше срока захвата '
+            'писем.'
+        )
+        email = queue_email('Subject', 'Body', 'admin@yamdb.fake',
+                            'user@yamdb.fake')
+        stale = claim_emails([email.pk])
+        OutgoingEmail.objects.filter(pk=email.pk).update(
+            send_after=timezone.now()
+        )
+        assert deliver_pending().sent == 1
+        record_results(stale, {email.pk: 'Timeout'}, DeliveryResult())
+        email.refresh_from_db()
+        assert email.status == OutgoingEmail.Status.SENT, (
+            'Проверьте, что запуск с истёкшим захватом не перезаписывает '
+            'результат отправки.'
+        )
+        assert (email.attempts, email.last_error) == (1, '')
@@ -0,0 +1,108 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26ConfirmationCodes:
+    url_signup = '/api/v1/auth/signup/'
+    url_token = '/api/v1/auth/token/'
+    data = {'username': 'new_user', 'email': 'new_user@yamdb.fake'}
+
+    def get_code(self):
+        from users.models import ConfirmationCode
+
+        return ConfirmationCode.objects.get(
+            user__username=self.data['username']
+        )
+
+    def get_token(self, client, code, username=None, **extra):
+        return client.post(self.url_token, data={
+            'username': username or self.data['username'],
+            'confirmation_code': code,
+        }, **extra)
+
+    def test_01_code_is_used_once(self, client):
+        client.post(self.url_signup, data=self.data)
+        code = self.get_code().code
+        assert self.get_token(client, code).status_code == HTTPStatus.OK
+        assert self.get_token(client, code).status_code == (
+            HTTPStatus.BAD_REQUEST
+        ), 'Проверьте, что код подтверждения используется только один раз.'
+
+    def test_02_expired_and_exhausted_codes(self, client, settings):
+        from users.models import ConfirmationCode
+
+        settings.CONFIRMATION_CODE_MAX_ATTEMPTS = 2
+        client.post(self.url_signup, data=self.data)
+        confirmation = self.get_code()
+        ConfirmationCode.objects.filter(pk=confirmation.pk).update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        response = self.get_token(client, confirmation.code)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что просроченный код подтверждения не принимается.'
+        )
+
+        client.post(self.url_signup, data=self.data)
+        confirmation = self.get_code()
+        for _ in range(2):
+            self.get_token(client, 'wrong')
+        assert self.get_code().attempts == 2
+        response = self.get_token(client, confirmation.code)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что код блокируется после исчерпания попыток.'
+        )
+
+        call_command('purge_confirmation_codes')
+        assert not ConfirmationCode.objects.exists(), (
+            'Проверьте, что команда `purge_confirmation_codes` удаляет '
+            'просроченные и исчерпанные коды.'
+        )
+
+    def test_03_resends_throttled_per_username(self, client):
+        for _ in range(5):
+            response = client.post(self.url_signup, data=self.data)
+            assert response.status_code == HTTPStatus.OK
+        response = client.post(self.url_signup, data=self.data)
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            f'Проверьте, что частота запросов к `{self.url_signup}` '
+            'ограничена для одного `username`.'
+        )
+        response = client.post(self.url_signup, data={
+            'username': 'other_user', 'email': 'other_user@yamdb.fake'
+        })
+        assert response.status_code == HTTPStatus.OK
+
+    def test_04_attempts_throttled_per_ip(self, client):
+        for idx in range(30):
+            self.get_token(client, 'wrong', username=f'user_{idx}',
+                           REMOTE_ADDR='10.0.0.1')
+        response = self.get_token(client, 'wrong', REMOTE_ADDR='10.0.0.1')
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            f'Проверьте, что частота запросов к `{self.url_token}` '
+            'ограничена для одного IP-адреса.'
+        )
+        response = self.get_token(client, 'wrong', REMOTE_ADDR='10.0.0.2')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        response = self.get_token(client, 'wrong', REMOTE_ADDR='10.0.0.1',
+                                  HTTP_X_FORWARDED_FOR='10.0.0.3')
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что ограничение по IP-адресу нельзя обойти '
+            'заголовком `X-Forwarded-For`.'
+        )
+
+    def test_05_concurrent_codes(self, client):
+        from users.codes import issue_code
+        from users.models import ConfirmationCode
+
+        client.post(self.url_signup, data=self.data)
+        user = self.get_code().user
+        code = issue_code(user, created=True)
+        assert ConfirmationCode.objects.get(user=user).code == code, (
+            'Проверьте, что код, уже созданный параллельным запросом, '
+            'заменяется новым.'
+        )
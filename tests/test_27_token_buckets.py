@@ -0,0 +1,92 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    from api.throttling import TokenBucketThrottle
+
+    now = [1000.0]
+    monkeypatch.setattr(TokenBucketThrottle, 'timer', lambda self: now[0])
+    return now
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27TokenBuckets:
+
+    def test_01_budgets_by_role(self, client, admin_client, settings, clock):
+        settings.THROTTLE_BUCKETS = {
+            'titles': {'anon': '3/min', 'admin': '10/min'},
+            'auth': {'anon': '1/min'},
+        }
+        for _ in range(3):
+            assert client.get('/api/v1/titles/').status_code == HTTPStatus.OK
+        response = client.get('/api/v1/titles/')
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что число запросов анонимного клиента к '
+            '`/api/v1/titles/` ограничено.'
+        )
+        assert response['Retry-After'] == '20'
+        for _ in range(5):
+            response = admin_client.get('/api/v1/titles/')
+            assert response.status_code == HTTPStatus.OK, (
+                'Проверьте, что у администратора свой, больший бюджет '
+                'запросов.'
+            )
+
+        clock[0] += 20
+        assert client.get('/api/v1/titles/').status_code == HTTPStatus.OK, (
+            'Проверьте, что бюджет запросов восполняется со временем.'
+        )
+        response = client.get('/api/v1/titles/')
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+
+        data = {'username': 'new_user', 'email': 'new_user@yamdb.fake'}
+        response = client.post('/api/v1/auth/signup/', data=data)
+        assert response.status_code == HTTPStatus.OK
+        response = client.post('/api/v1/auth/signup/', data=data)
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+
+    def test_02_writes_have_own_budget(self, user_client, settings, clock):
+        from reviews.models import Title
+
+        settings.THROTTLE_BUCKETS = {
+            'reviews': {'user': '100/min'},
+            'reviews_write': {'user': '2/min'},
+        }
+        titles = [
+            Title.objects.create(name=f'Произведение {idx}', year=2000)
+            for idx in range(3)
+        ]
+        statuses = [
+            user_client.post(
+                f'/api/v1/titles/{title.id}/reviews/',
+                data={'text': 'Отзыв', 'score': 5}
+            ).status_code
+            for title in titles
+        ]
+        assert statuses == [
+            HTTPStatus.CREATED, HTTPStatus.CREATED,
+            HTTPStatus.TOO_MANY_REQUESTS,
+        ], 'Проверьте, что создание отзывов ограничено отдельным бюджетом.'
+        response = user_client.get(f'/api/v1/titles/{titles[0].id}/reviews/')
+        assert response.status_code == HTTPStatus.OK
+
+    def test_03_check_costs_no_queries(self, user_client, settings):
+        from reviews.models import Title
+
+        title = Title.objects.create(name='Произведение', year=2000)
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        counts = []
+        for buckets in ({}, {'reviews': {'user': '100/min'}}):
+            settings.THROTTLE_BUCKETS = buckets
+            with CaptureQueriesContext(connection) as context:
+                assert user_client.get(url).status_code == HTTPStatus.OK
+            counts.append(len(context.captured_queries))
+        assert counts[0] == counts[1], (
+            'Проверьте, что проверка бюджета запросов не обращается к базе '
+            'данных.'
+        )
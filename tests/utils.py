@@ -1,3 +1,6 @@
+import os
+import subprocess
+import sys
 from http import HTTPStatus
 
 
@@ -305,3 +308,17 @@ def check_fields(obj_type, url_pattern, obj, expected_data, detail=False):
         f'данные {obj_types[obj_type]}{results_in_msg}. Поле `id` не '
         'найдено или не является целым числом.'
     )
+
+
+def run_in_other_process(code):
+    """Run python code with the project settings in a separate process."""
+    project_dir = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        'api_yamdb'
+    )
+    result = subprocess.run(
+        [sys.executable, '-c', f'import django\ndjango.setup()\n{code}'],
+        cwd=project_dir, capture_output=True, text=True, check=True,
+        env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'api_yamdb.settings'},
+    )
+    return result.stdout